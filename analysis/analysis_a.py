@@ -1,13 +1,17 @@
 """
 analysis/analysis_a.py - Geliştirilmiş Ana Analiz Aggregator
 Artık async_lru bağımlılığı yok.
-Cache yönetimi full kontrol sende (TTL, temizleme).
-bu cache’e LRU (en az kullanılanı at) mantığını da ekleyebilirim
+Cache yönetimi full kontrol sende (TTL, temizleme, LRU boyut sınırı).
 """
 
 import asyncio
+import bisect
 import logging
+import math
+import threading
 import time
+from collections import OrderedDict
+from functools import cached_property
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 import numpy as np
@@ -16,7 +20,7 @@ from config import BotConfig, get_config
 from utils.binance.binance_a import BinanceAPI
 
 # Analiz modüllerini import et
-from .causality import CausalityAnalyzer
+from .causality import CausalityAnalyzer, get_causality_analyzer
 from .derivs import compute_derivatives_sentiment
 from .onchain import get_onchain_analyzer
 from .orderflow import OrderflowAnalyzer
@@ -32,17 +36,19 @@ logger = logging.getLogger(__name__)
 # Custom AsyncCache
 # ----------------------
 class AsyncCache:
-    """Basit, async uyumlu in-memory cache (TTL destekli)."""
-    def __init__(self, ttl: int = 60):
+    """Basit, async uyumlu in-memory cache (TTL + LRU boyut sınırı)."""
+    def __init__(self, ttl: int = 60, max_size: int = 256):
         self.ttl = ttl
-        self._cache: Dict[str, tuple[Any, float]] = {}
+        self.max_size = max_size
+        self._cache: OrderedDict[str, tuple[Any, float]] = OrderedDict()
         self._lock = asyncio.Lock()
 
     async def get(self, key: str):
         async with self._lock:
             if key in self._cache:
                 value, timestamp = self._cache[key]
-                if time.time() - timestamp < self.ttl:
+                if time.monotonic() - timestamp < self.ttl:
+                    self._cache.move_to_end(key)
                     return value
                 else:
                     # TTL süresi dolmuş → temizle
@@ -51,7 +57,11 @@ class AsyncCache:
 
     async def set(self, key: str, value: Any):
         async with self._lock:
-            self._cache[key] = (value, time.time())
+            self._cache[key] = (value, time.monotonic())
+            self._cache.move_to_end(key)
+            # En az kullanılanı at → sınırsız büyüme yok
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
 
 
 @dataclass
@@ -74,11 +84,48 @@ class AnalysisAggregator:
     """Geliştirilmiş ana analiz aggregator"""
     
     _instance = None
+    _instance_lock = threading.Lock()
+    
+    # Lazy oluşturulan alt analizörler (binance_api değişince sıfırlanır)
+    _ANALYZERS = ("causality", "onchain", "orderflow", "regime", "risk", "tremo")
+    
+    # _get_recommendation çıktı tablosu: (öneri, taban, güven katsayısı, üst sınır)
+    # Sıra: strong_bear ↓ | bear ↓ | HOLD | bull ↑ | strong_bull ↑
+    _RECOMMENDATIONS = (
+        ("STRONG_SELL", 0.8, 0.2, 1.0),
+        ("SELL", 0.5, 0.3, 0.8),
+        ("HOLD", 0.0, 0.0, 0.0),
+        ("BUY", 0.5, 0.3, 0.8),
+        ("STRONG_BUY", 0.8, 0.2, 1.0),
+    )
+    
+    # Modül adı → (coroutine üretici, skor çıkarıcı, hata/timeout varsayılanı)
+    # Alt analizörün coroutine'i doğrudan task olur; ara _run_* wrapper yok.
+    _MODULES = (
+        ("causality", lambda self, s: self.causality.get_causality_score(s),
+         lambda r: r.get("score", 0.0), 0.0),
+        ("derivs", lambda self, s: compute_derivatives_sentiment(self.binance, s),
+         lambda r: r.get("combined_score", 0.0), 0.0),
+        ("onchain", lambda self, s: self.onchain.aggregate_score(),
+         lambda r: r.get("aggregate", 0.0), 0.0),
+        ("orderflow", lambda self, s: self.orderflow.compute_orderflow_score(s),
+         lambda r: r.get("pressure_score", 0.0), 0.0),
+        ("regime", lambda self, s: self.regime.analyze(s),
+         lambda r: r.score, 0.0),
+        ("tremo", lambda self, s: self.tremo.analyze(s),
+         lambda r: r.signal_score, 0.0),
+        ("risk", lambda self, s: self.risk.combined_risk_score(s),
+         lambda r: r.score, 0.6),
+    )
     
     def __new__(cls, binance_api: BinanceAPI):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialize(binance_api)
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._initialize(binance_api)
+                cls._instance = instance
+            elif cls._instance.binance is not binance_api:
+                cls._instance._rebind(binance_api)
         return cls._instance
     
     def _initialize(self, binance_api: BinanceAPI):
@@ -86,21 +133,53 @@ class AnalysisAggregator:
         self.config = None
         self._performance_metrics = []
 
-        # Cache → 60 saniyelik TTL
-        self._cache = AsyncCache(ttl=60)
-        
-        # Analiz modüllerini initialize et
-        self.causality = CausalityAnalyzer()
-        self.causality.set_binance_api(binance_api)
-        
-        self.onchain = get_onchain_analyzer(binance_api)
-        self.orderflow = OrderflowAnalyzer(binance_api)
-        self.regime = get_regime_analyzer(binance_api)
-        self.risk = RiskManager(binance_api)
-        self.tremo = TremoAnalyzer(binance_api)
+        # Cache → 60 saniyelik TTL, sembol başına tek kayıt
+        self._cache = AsyncCache(ttl=60, max_size=256)
+        # Aynı sembol için eşzamanlı istekler tek analizi paylaşır
+        self._inflight: Dict[str, asyncio.Future] = {}
         
         # Skor agregator
         self.score_aggregator = get_score_aggregator()
+        
+        # Öneri eşikleri (SIGNAL_THRESHOLDS değişince yeniden kurulur)
+        self._thresholds_source: Optional[Dict[str, float]] = None
+        self._thresholds_sorted: List[float] = []
+    
+    def _rebind(self, binance_api: BinanceAPI):
+        """Singleton'ı yeni BinanceAPI'ye açıkça bağla, eski referansları bırak"""
+        logger.warning("⚠️ AnalysisAggregator yeni BinanceAPI instance'ına bağlanıyor")
+        self.binance = binance_api
+        self._cache = AsyncCache(ttl=60, max_size=256)
+        for name in self._ANALYZERS:
+            self.__dict__.pop(name, None)
+    
+    # ----------------------
+    # Alt analizörler (ilk run_analysis'te oluşturulur)
+    # ----------------------
+    
+    @cached_property
+    def causality(self) -> CausalityAnalyzer:
+        return get_causality_analyzer(self.binance)
+    
+    @cached_property
+    def onchain(self):
+        return get_onchain_analyzer(self.binance)
+    
+    @cached_property
+    def orderflow(self) -> OrderflowAnalyzer:
+        return OrderflowAnalyzer(self.binance)
+    
+    @cached_property
+    def regime(self):
+        return get_regime_analyzer(self.binance)
+    
+    @cached_property
+    def risk(self) -> RiskManager:
+        return RiskManager(self.binance)
+    
+    @cached_property
+    def tremo(self) -> TremoAnalyzer:
+        return TremoAnalyzer(self.binance)
     
     async def _get_config(self):
         """Geliştirilmiş config yönetimi"""
@@ -139,52 +218,64 @@ class AnalysisAggregator:
         return results
     
     async def run_analysis(self, symbol: str) -> AnalysisResult:
-        """Geliştirilmiş analiz metodu"""
+        """Geliştirilmiş analiz metodu (cache + in-flight dedupe)"""
+        # Cache kontrolü
+        cached = await self._get_cached_analysis(symbol)
+        if cached:
+            return cached
+        
+        pending = self._inflight.get(symbol)
+        if pending is None:
+            pending = asyncio.ensure_future(self._compute_analysis(symbol))
+            self._inflight[symbol] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(symbol, None))
+        
+        # shield: bir çağıranın iptali diğerlerinin paylaştığı analizi iptal etmesin
+        return await asyncio.shield(pending)
+    
+    async def _compute_analysis(self, symbol: str) -> AnalysisResult:
+        """Tüm modülleri çalıştırıp sonucu cache'e yaz"""
         start_time = time.time()
         
         try:
             config = await self._get_config()
-            cache_key = f"analysis_{symbol}_{int(time.time() // 60)}"
-            
-            # Cache kontrolü
-            cached = await self._get_cached_analysis(cache_key)
-            if cached:
-                return cached
             
             module_scores = {}
             module_errors = {}
             
-            # Tüm modülleri paralel çalıştır
-            tasks = {
-                "causality": asyncio.create_task(self._run_causality(symbol)),
-                "derivs": asyncio.create_task(self._run_derivs(symbol)),
-                "onchain": asyncio.create_task(self._run_onchain()),
-                "orderflow": asyncio.create_task(self._run_orderflow(symbol)),
-                "regime": asyncio.create_task(self._run_regime(symbol)),
-                "tremo": asyncio.create_task(self._run_tremo(symbol)),
-                "risk": asyncio.create_task(self._run_risk(symbol))
-            }
+            # Tüm modülleri paralel çalıştır (modül başına tek task)
+            modules = self._MODULES
+            tasks = [asyncio.create_task(run(self, symbol)) for _, run, _, _ in modules]
             
-            # Timeout ile çalıştır
-            for name, task in tasks.items():
-                try:
-                    result = await asyncio.wait_for(task, timeout=30.0)
-                    module_scores[name] = result
-                except asyncio.TimeoutError:
+            # Ortak 30 sn timeout; biten task'lar beklenmeden sonuçlanır
+            _, pending = await asyncio.wait(tasks, timeout=30.0)
+            for task in pending:
+                task.cancel()
+            
+            for (name, _, extract, default), task in zip(modules, tasks):
+                if task in pending:
                     logger.warning(f"{name} modülü timeout oldu")
-                    module_scores[name] = 0.0
+                    module_scores[name] = default
                     module_errors[name] = "timeout"
+                    continue
+                if task.cancelled():
+                    # Alt modül içeriden iptal edildi (CancelledError Exception değil)
+                    logger.warning(f"{name} modülü iptal edildi")
+                    module_scores[name] = default
+                    module_errors[name] = "cancelled"
+                    continue
+                try:
+                    module_scores[name] = extract(task.result())
                 except Exception as e:
                     logger.error(f"{name} modülü hatası: {e}")
-                    module_scores[name] = 0.0
+                    module_scores[name] = default
                     module_errors[name] = str(e)
             
             # Skor agregasyonu
             score_result = self.score_aggregator.calculate_final_score(module_scores)
             
-            # Risk skoru
-            risk_result = await self.risk.combined_risk_score(symbol)
-            position_risk_score = risk_result.get("score", 0.6)
+            # Risk skoru (risk modülü zaten çalıştı, tekrar çağrılmaz)
+            position_risk_score = module_scores["risk"]
             
             # Gnosis signal
             gnosis_signal = score_result["final_score"] * position_risk_score
@@ -217,7 +308,7 @@ class AnalysisAggregator:
             )
             
             # Cache'e kaydet
-            await self._cache.set(cache_key, result)
+            await self._cache.set(symbol, result)
             
             logger.info(f"✅ Analiz tamamlandı: {symbol} - Skor: {gnosis_signal:.3f} - Güven: {score_result['confidence']:.2f}")
             return result
@@ -264,22 +355,22 @@ class AnalysisAggregator:
     def _get_recommendation(self, gnosis_signal: float, confidence: float, config) -> Tuple[str, float]:
         """Geliştirilmiş öneri sistemi"""
         thresholds = config.SIGNAL_THRESHOLDS
+        if thresholds is not self._thresholds_source:
+            # Alt eşikler dahil (<=), üst eşikler dahil (>=): üst eşikleri bir ulp
+            # aşağı çekince tek bisect_left tüm merdiveni karşılar
+            self._thresholds_sorted = [
+                thresholds["strong_bear"],
+                thresholds["bear"],
+                math.nextafter(thresholds["bull"], -math.inf),
+                math.nextafter(thresholds["strong_bull"], -math.inf),
+            ]
+            self._thresholds_source = thresholds
         
+        # signal >= t * m  ⇔  signal / m >= t  (m = 0.5 + 0.5 * confidence > 0)
         confidence_multiplier = 0.5 + (confidence * 0.5)
-        adjusted_thresholds = {
-            k: v * confidence_multiplier for k, v in thresholds.items()
-        }
-        
-        if gnosis_signal >= adjusted_thresholds["strong_bull"]:
-            return "STRONG_BUY", min(1.0, 0.8 + (confidence * 0.2))
-        elif gnosis_signal >= adjusted_thresholds["bull"]:
-            return "BUY", min(0.8, 0.5 + (confidence * 0.3))
-        elif gnosis_signal <= adjusted_thresholds["strong_bear"]:
-            return "STRONG_SELL", min(1.0, 0.8 + (confidence * 0.2))
-        elif gnosis_signal <= adjusted_thresholds["bear"]:
-            return "SELL", min(0.8, 0.5 + (confidence * 0.3))
-        else:
-            return "HOLD", 0.0
+        idx = bisect.bisect_left(self._thresholds_sorted, gnosis_signal / confidence_multiplier)
+        label, base, slope, cap = self._RECOMMENDATIONS[idx]
+        return label, min(cap, base + (confidence * slope))
     
     async def _get_market_regime(self, symbol: str) -> str:
         """Piyasa rejimini belirle"""
@@ -372,67 +463,6 @@ class AnalysisAggregator:
         diversification = max(0, 1 - abs(avg_correlation))
         return diversification
 
-    # ----------------------
-    # Modül çalıştırma metodları
-    # ----------------------
-    
-    async def _run_risk(self, symbol: str) -> float:
-        try:
-            risk_result = await self.risk.combined_risk_score(symbol)
-            return risk_result.get("score", 0.6)
-        except Exception as e:
-            logger.error(f"Risk analiz hatası: {e}")
-            return 0.6
-
-    async def _run_derivs(self, symbol: str) -> float:
-        try:
-            from .derivs import compute_derivatives_sentiment
-            result = await compute_derivatives_sentiment(self.binance, symbol)
-            return result.get("combined_score", 0.0)
-        except Exception as e:
-            logger.error(f"Derivs analiz hatası: {e}")
-            return 0.0
-
-    async def _run_onchain(self) -> float:
-        try:
-            result = await self.onchain.aggregate_score()
-            return result.get("aggregate", 0.0)
-        except Exception as e:
-            logger.error(f"On-chain analiz hatası: {e}")
-            return 0.0
-
-    async def _run_orderflow(self, symbol: str) -> float:
-        try:
-            result = await self.orderflow.compute_orderflow_score(symbol)
-            return result.get("pressure_score", 0.0)
-        except Exception as e:
-            logger.error(f"Orderflow analiz hatası: {e}")
-            return 0.0
-
-    async def _run_regime(self, symbol: str) -> float:
-        try:
-            result = await self.regime.analyze(symbol)
-            return result.score
-        except Exception as e:
-            logger.error(f"Regime analiz hatası: {e}")
-            return 0.0
-
-    async def _run_tremo(self, symbol: str) -> float:
-        try:
-            result = await self.tremo.analyze(symbol)
-            return result.signal_score
-        except Exception as e:
-            logger.error(f"Tremo analiz hatası: {e}")
-            return 0.0
-
-    async def _run_causality(self, symbol: str) -> float:
-        try:
-            result = await self.causality.get_causality_score(symbol)
-            return result.get("score", 0.0)
-        except Exception as e:
-            logger.error(f"Causality analiz hatası: {e}")
-            return 0.0
-
 
 # Singleton instance
 def get_analysis_aggregator(binance_api: BinanceAPI) -> AnalysisAggregator:
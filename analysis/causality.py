@@ -16,14 +16,13 @@ analizini yapar. Sonuçlar -1 (Altcoin Bear) ile +1 (Altcoin Bull) arasında nor
 - Config yönetimi entegrasyonu
 
 Kullanım:
-    from analytics.causality import CausalityAnalyzer
+    from analytics.causality import get_causality_analyzer
     
-    analyzer = CausalityAnalyzer()
-    await analyzer.set_binance_api(binance_api_instance)
+    analyzer = get_causality_analyzer(binance_api_instance)
     score = await analyzer.get_causality_score("ETHUSDT")
 
 🔧 Özellikler:
-- Singleton pattern
+- BinanceAPI başına tek instance (registry factory, close_causality_analyzer ile temizlenir)
 - Async/await uyumlu
 - Aiogram 3.x Router pattern ile entegre
 - Type hints + comprehensive docstrings
@@ -33,9 +32,10 @@ Kullanım:
 """
 
 import logging
-from typing import Optional, Dict, List, Tuple
+import math
+import time
+from typing import Callable, Optional, Dict, List, Tuple
 import numpy as np
-from statsmodels.tsa.stattools import grangercausalitytests
 from datetime import datetime, timedelta
 import asyncio
 
@@ -45,30 +45,105 @@ from config import get_config
 logger = logging.getLogger(__name__)
 
 
-class CausalityAnalyzer:
-    """BTC liderliği ve altcoin takibi için Granger causality tabanlı analiz."""
+def _closes(klines: List[List]) -> np.ndarray:
+    """
+    Extract close prices (column 4) from raw klines as float64.
+    
+    np.fromiter + count diziyi önceden ayırır; ara Python list'i ve
+    eleman başına float() çağrısı oluşmaz.
+    
+    Args:
+        klines: Raw Binance klines
+        
+    Returns:
+        Close prices array
+    """
+    return np.fromiter((k[4] for k in klines), dtype=np.float64, count=len(klines))
 
-    _instance: Optional["CausalityAnalyzer"] = None
-    _initialization_lock = asyncio.Lock()
 
-    def __new__(cls) -> "CausalityAnalyzer":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-            logger.info("✅ CausalityAnalyzer singleton instance created")
-        return cls._instance
+def _granger_f_stats(y: np.ndarray, x: np.ndarray, maxlag: int) -> np.ndarray:
+    """
+    Granger F statistics (x -> y) for lags 1..maxlag via direct OLS.
+    
+    statsmodels ``ssr_ftest`` ile aynı: restricted model y'nin lag'leri,
+    unrestricted model y + x lag'leri (ikisi de sabit terimli). Numba
+    kuruluysa ilk kullanımda njit ile derlenir (bkz. _get_granger_kernel);
+    değilse aynı kod NumPy ile çalışır.
+    
+    Args:
+        y: Dependent series (altcoin closes), contiguous float64
+        x: Candidate cause series (BTC closes), contiguous float64
+        maxlag: Maximum lag
+        
+    Returns:
+        F statistic per lag (index 0 → lag 1)
+    """
+    size = y.shape[0]
+    f_stats = np.empty(maxlag)
+    
+    for lag in range(1, maxlag + 1):
+        n = size - lag
+        target = y[lag:].copy()
+        
+        # Kolon 0: sabit, 1..lag: y lag'leri, lag+1..2*lag: x lag'leri
+        unrestricted = np.ones((n, 2 * lag + 1))
+        for j in range(1, lag + 1):
+            unrestricted[:, j] = y[lag - j:size - j]
+            unrestricted[:, lag + j] = x[lag - j:size - j]
+        restricted = unrestricted[:, :lag + 1].copy()
+        
+        beta_r = np.linalg.lstsq(restricted, target)[0]
+        resid_r = target - restricted @ beta_r
+        beta_u = np.linalg.lstsq(unrestricted, target)[0]
+        resid_u = target - unrestricted @ beta_u
+        
+        rss_r = resid_r @ resid_r
+        rss_u = resid_u @ resid_u
+        df_resid = n - 2 * lag - 1
+        f_stats[lag - 1] = ((rss_r - rss_u) / lag) / (rss_u / df_resid)
+    
+    return f_stats
 
-    async def initialize(self) -> None:
-        """Async initialization with thread-safe locking."""
-        async with self._initialization_lock:
-            if not self._initialized:
-                await self._initialize()
-                self._initialized = True
 
-    async def _initialize(self) -> None:
-        """Initialize instance components and configuration."""
-        self.binance: Optional[BinanceAPI] = None
-        self.config = await get_config()
+_granger_kernel: Optional[Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = None
+
+
+def _get_granger_kernel() -> Callable[[np.ndarray, np.ndarray, int], np.ndarray]:
+    """
+    Resolve the Granger F kernel on first use.
+    
+    numba import'u ağır olduğundan modül yüklenirken değil, ilk Granger
+    testinde yapılır; yoksa saf NumPy sürümü kullanılır.
+    
+    Returns:
+        Compiled (numba) or plain _granger_f_stats
+    """
+    global _granger_kernel
+    if _granger_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # opsiyonel
+            _granger_kernel = _granger_f_stats
+        else:
+            # cache=True: derleme (~0.3 sn) diske yazılır, sonraki process'ler tekrar derlemez
+            _granger_kernel = njit(cache=True, fastmath=True)(_granger_f_stats)
+    return _granger_kernel
+
+
+class CausalityAnalyzer:
+    """BTC liderliği ve altcoin takibi için Granger causality tabanlı analiz."""
+
+    def __init__(self, binance: BinanceAPI) -> None:
+        """
+        Initialize analyzer bound to a BinanceAPI instance.
+        
+        Args:
+            binance: BinanceAPI instance
+        """
+        self.binance = binance
+        self.config = None
+        self._initialized = False
+        self._initialization_lock = asyncio.Lock()
         
         # Price cache: {symbol: (timestamp, value)}
         self._price_cache: Dict[str, Tuple[datetime, float]] = {}
@@ -79,17 +154,22 @@ class CausalityAnalyzer:
         self._cache_ttl = timedelta(seconds=10)
         self._top_altcoins = ["BNBUSDT", "ADAUSDT", "SOLUSDT", "XRPUSDT", "DOTUSDT"]
         
-        logger.info("✅ CausalityAnalyzer initialized successfully")
-
-    def set_binance_api(self, binance: BinanceAPI) -> None:
-        """
-        Set Binance API instance.
+        # Kline close cache: {(symbol, interval): (monotonic_ts, fetched_limit, last_open_time, closes)}
+        # Korelasyon ve Granger aynı seriyi tek fetch ile paylaşır
+        self._klines_cache: Dict[Tuple[str, str], Tuple[float, int, int, np.ndarray]] = {}
+        self._klines_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._klines_ttl = 60.0
+        self._klines_limit = max(self._default_window, 200, self._maxlag * 10)
         
-        Args:
-            binance: BinanceAPI instance
-        """
-        self.binance = binance
-        logger.info("✅ BinanceAPI instance set for CausalityAnalyzer")
+        logger.info("✅ CausalityAnalyzer created")
+
+    async def initialize(self) -> None:
+        """Async initialization (config load) with locking."""
+        async with self._initialization_lock:
+            if not self._initialized:
+                self.config = await get_config()
+                self._initialized = True
+                logger.info("✅ CausalityAnalyzer initialized successfully")
 
     async def _get_price(self, symbol: str) -> float:
         """
@@ -101,9 +181,6 @@ class CausalityAnalyzer:
         Returns:
             Current price or 0.0 on error
         """
-        if not self.binance:
-            raise RuntimeError("BinanceAPI not set. Call set_binance_api() first.")
-        
         now = datetime.utcnow()
         cached = self._price_cache.get(symbol)
         
@@ -125,6 +202,55 @@ class CausalityAnalyzer:
             logger.exception(f"❌ Price fetch error for {symbol}: {e}")
             return 0.0
 
+    async def _get_closes(self, symbol: str, limit: int, interval: str = "1h") -> np.ndarray:
+        """
+        Get close prices through a short TTL cache.
+        
+        The largest window is fetched once and smaller windows are served as
+        tail slices, so concurrent correlation/Granger calls share one request.
+        After TTL expiry only bars since the last cached open time are fetched
+        (startTime) and rolled into the buffer.
+        
+        Args:
+            symbol: Trading symbol (e.g., "BTCUSDT")
+            limit: Number of most recent closes needed
+            interval: Kline interval
+            
+        Returns:
+            Close prices as float64 array (empty if no data)
+        """
+        key = (symbol, interval)
+        lock = self._klines_locks.get(key)
+        if lock is None:
+            lock = self._klines_locks[key] = asyncio.Lock()
+        
+        async with lock:
+            now = time.monotonic()
+            cached = self._klines_cache.get(key)
+            if cached and cached[1] >= limit:
+                _, fetch_limit, last_open_time, buffer = cached
+                if now - cached[0] < self._klines_ttl:
+                    return buffer[-limit:]
+                
+                # Artımlı güncelleme: son (açık) bar + sonrası
+                klines = await self.binance.public.get_klines(
+                    symbol, interval=interval, limit=fetch_limit, start_time=last_open_time
+                )
+                if klines and klines[0][0] == last_open_time and len(klines) < fetch_limit:
+                    # Son bar güncellenir, yeni barlar eklenir, pencere kaydırılır.
+                    # Yeni dizi → önceki çağrılara verilen view'lar değişmez.
+                    buffer = np.concatenate((buffer[:-1], _closes(klines)))[-fetch_limit:]
+                    self._klines_cache[key] = (now, fetch_limit, int(klines[-1][0]), buffer)
+                    return buffer[-limit:]
+            
+            fetch_limit = max(limit, self._klines_limit)
+            klines = await self.binance.public.get_klines(symbol, interval=interval, limit=fetch_limit)
+            if not klines:
+                return np.empty(0)
+            closes = _closes(klines)
+            self._klines_cache[key] = (now, fetch_limit, int(klines[-1][0]), closes)
+            return closes[-limit:]
+
     async def _get_btc_dominance(self) -> float:
         """
         Calculate BTC dominance proxy (BTC / (BTC + ETH + Top Alts)).
@@ -170,24 +296,17 @@ class CausalityAnalyzer:
         Returns:
             Correlation coefficient or 0.0 on error
         """
-        if not self.binance:
-            raise RuntimeError("BinanceAPI not set. Call set_binance_api() first.")
-        
         window = window or self._default_window
         
         try:
-            # Fetch klines data
-            btc_klines = await self.binance.public.get_klines("BTCUSDT", interval="1h", limit=window)
-            alt_klines = await self.binance.public.get_klines(symbol, interval="1h", limit=window)
+            # Fetch close prices (cached, shared with Granger test)
+            btc_closes = await self._get_closes("BTCUSDT", window)
+            alt_closes = await self._get_closes(symbol, window)
             
-            if not btc_klines or not alt_klines:
+            if btc_closes.size == 0 or alt_closes.size == 0:
                 logger.warning(f"⚠️ No klines data for correlation: {symbol}")
                 return 0.0
             
-            # Extract close prices
-            btc_closes = np.array([float(k[4]) for k in btc_klines])
-            alt_closes = np.array([float(k[4]) for k in alt_klines])
-            
             # Data validation
             if len(btc_closes) != len(alt_closes):
                 logger.warning(f"⚠️ Data length mismatch for correlation: {symbol}")
@@ -228,25 +347,18 @@ class CausalityAnalyzer:
         Returns:
             Granger causality score or 0.0 on error
         """
-        if not self.binance:
-            raise RuntimeError("BinanceAPI not set. Call set_binance_api() first.")
-        
         maxlag = maxlag or self._maxlag
         data_limit = max(200, maxlag * 10)  # Ensure sufficient data
         
         try:
-            # Fetch klines data
-            btc_klines = await self.binance.public.get_klines("BTCUSDT", interval="1h", limit=data_limit)
-            alt_klines = await self.binance.public.get_klines(symbol, interval="1h", limit=data_limit)
+            # Fetch close prices (cached, shared with correlation)
+            btc_closes = await self._get_closes("BTCUSDT", data_limit)
+            alt_closes = await self._get_closes(symbol, data_limit)
             
-            if not btc_klines or not alt_klines:
+            if btc_closes.size == 0 or alt_closes.size == 0:
                 logger.warning(f"⚠️ No klines data for Granger test: {symbol}")
                 return 0.0
             
-            # Extract close prices
-            btc_closes = np.array([float(k[4]) for k in btc_klines])
-            alt_closes = np.array([float(k[4]) for k in alt_klines])
-            
             # Data validation
             if len(btc_closes) != len(alt_closes):
                 logger.warning(f"⚠️ Data length mismatch for Granger test: {symbol}")
@@ -264,19 +376,21 @@ class CausalityAnalyzer:
                 logger.debug(f"⚠️ Constant data detected for Granger test: {symbol}")
                 return 0.0
             
-            # Prepare data for Granger test
-            data = np.column_stack([alt_closes, btc_closes])
+            # scipy.stats yalnızca Granger testinde gerekli → lazy import
+            from scipy import stats
             
-            # Perform Granger causality test
-            result = grangercausalitytests(data, maxlag=maxlag, verbose=False)
-            
-            # Extract p-values
-            p_values = [result[i + 1][0]['ssr_ftest'][1] for i in range(maxlag)]
+            # Granger F-test per lag (direct OLS, statsmodels overhead yok)
+            f_stats = _get_granger_kernel()(
+                np.ascontiguousarray(alt_closes), np.ascontiguousarray(btc_closes), maxlag
+            )
+            lags = np.arange(1, maxlag + 1)
+            df_resid = (len(alt_closes) - lags) - 2 * lags - 1
+            p_values = stats.f.sf(f_stats, lags, df_resid)
             
             # Handle NaN p-values
-            valid_p_values = [p for p in p_values if not np.isnan(p)]
+            valid_p_values = p_values[~np.isnan(p_values)]
             
-            if not valid_p_values:
+            if valid_p_values.size == 0:
                 logger.warning(f"⚠️ All p-values are NaN for Granger test: {symbol}")
                 return 0.0
             
@@ -300,15 +414,10 @@ class CausalityAnalyzer:
         Returns:
             Dictionary containing dominance, correlation, granger, and final score
             
-        Raises:
-            RuntimeError: If BinanceAPI not set or analyzer not initialized
         """
         if not self._initialized:
             await self.initialize()
         
-        if not self.binance:
-            raise RuntimeError("BinanceAPI not set. Call set_binance_api() first.")
-        
         try:
             # Execute analyses in parallel
             dominance_task = self._get_btc_dominance()
@@ -338,8 +447,8 @@ class CausalityAnalyzer:
             if not valid_components:
                 final_score = 0.0
             else:
-                average_score = np.mean(valid_components)
-                final_score = np.tanh(average_score)  # Normalize to [-1, 1]
+                average_score = sum(valid_components) / len(valid_components)
+                final_score = math.tanh(average_score)  # Normalize to [-1, 1]
             
             result = {
                 "dominance": float(dominance),
@@ -403,6 +512,7 @@ class CausalityAnalyzer:
     async def cleanup(self) -> None:
         """Cleanup resources and clear cache."""
         self._price_cache.clear()
+        self._klines_cache.clear()
         logger.info("✅ CausalityAnalyzer cache cleared")
 
     async def get_analysis_parameters(self) -> Dict[str, any]:
@@ -418,6 +528,7 @@ class CausalityAnalyzer:
             "cache_ttl_seconds": self._cache_ttl.total_seconds(),
             "top_altcoins": self._top_altcoins,
             "cache_size": len(self._price_cache),
+            "klines_cache_size": len(self._klines_cache),
             "initialized": self._initialized,
             "binance_set": self.binance is not None,
         }
@@ -427,52 +538,48 @@ class CausalityAnalyzer:
 # GLOBAL FACTORY FUNCTIONS AND CONTEXT MANAGER
 # =============================================================================
 
-_causality_analyzer_instance: Optional[CausalityAnalyzer] = None
-_analyzer_lock = asyncio.Lock()
+# BinanceAPI başına paylaşılan instance'lar (identity key)
+_analyzers: Dict[BinanceAPI, CausalityAnalyzer] = {}
 
-async def get_causality_analyzer() -> CausalityAnalyzer:
+def get_causality_analyzer(binance: BinanceAPI) -> CausalityAnalyzer:
     """
-    Get or create global CausalityAnalyzer instance.
+    Get or create the CausalityAnalyzer bound to a BinanceAPI instance.
     
+    Args:
+        binance: BinanceAPI instance
+        
     Returns:
-        CausalityAnalyzer singleton instance
+        CausalityAnalyzer instance (one per BinanceAPI)
     """
-    global _causality_analyzer_instance
-    
-    async with _analyzer_lock:
-        if _causality_analyzer_instance is None:
-            _causality_analyzer_instance = CausalityAnalyzer()
-            await _causality_analyzer_instance.initialize()
-            logger.info("✅ Global CausalityAnalyzer instance created")
-        
-        return _causality_analyzer_instance
+    analyzer = _analyzers.get(binance)
+    if analyzer is None:
+        analyzer = _analyzers[binance] = CausalityAnalyzer(binance)
+        logger.info("✅ CausalityAnalyzer instance created for BinanceAPI")
+    return analyzer
 
 async def close_causality_analyzer() -> None:
     """
-    Close and cleanup global CausalityAnalyzer instance.
+    Clean up all cached CausalityAnalyzer instances and drop them
+    (releases the BinanceAPI references held by the registry).
     """
-    global _causality_analyzer_instance
-    
-    if _causality_analyzer_instance is not None:
-        await _causality_analyzer_instance.cleanup()
-        _causality_analyzer_instance = None
-        logger.info("✅ Global CausalityAnalyzer instance closed")
+    analyzers = list(_analyzers.values())
+    _analyzers.clear()
+    for analyzer in analyzers:
+        await analyzer.cleanup()
+    logger.info("✅ CausalityAnalyzer instances closed")
 
 # Context manager for temporary usage
 class CausalityAnalyzerContext:
     """Context manager for CausalityAnalyzer with automatic cleanup."""
     
-    def __init__(self, binance_api: Optional[BinanceAPI] = None):
+    def __init__(self, binance_api: BinanceAPI):
         self.binance_api = binance_api
         self.analyzer: Optional[CausalityAnalyzer] = None
     
     async def __aenter__(self) -> CausalityAnalyzer:
         """Enter context and return analyzer instance."""
-        self.analyzer = await get_causality_analyzer()
-        
-        if self.binance_api:
-            self.analyzer.set_binance_api(self.binance_api)
-        
+        self.analyzer = get_causality_analyzer(self.binance_api)
+        await self.analyzer.initialize()
         return self.analyzer
     
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -515,8 +622,7 @@ def setup_causality_router(router: any, binance_api: BinanceAPI) -> any:
     async def causality_command(message: Message, symbol: str = "ETHUSDT"):
         """Causality analysis command handler."""
         try:
-            analyzer = await get_causality_analyzer()
-            analyzer.set_binance_api(binance_api)
+            analyzer = get_causality_analyzer(binance_api)
             
             score = await analyzer.get_causality_score(symbol.upper())
             
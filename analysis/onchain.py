@@ -16,42 +16,125 @@ Güncellemeler:
 import logging
 import asyncio
 import time
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Hashable
 import aiohttp
 import numpy as np
 
+try:
+    # aiodns kuruluysa c-ares tabanlı non-blocking resolver (threadpool getaddrinfo yerine)
+    import aiodns  # noqa: F401
+    from aiohttp.resolver import AsyncResolver
+except ImportError:
+    AsyncResolver = None
+
 from utils.binance.binance_a import BinanceAPI
+from utils.binance.binance_json import loads as json_loads
 from config import get_config, BotConfig, OnChainConfig
 
 logger = logging.getLogger(__name__)
 
+GLASSNODE_BASE_URL = "https://api.glassnode.com/v1"
+# Yalnızca son değer kullanılır: 24h çözünürlükte son kapanmış bucket'ı
+# garanti eden en dar pencere (2 bucket)
+GLASSNODE_LATEST_WINDOW = 86400 * 2
+FEAR_GREED_URL = "https://api.alternative.me/fng/"
+
+# BinanceAPI yokken döndürülen sabit nötr sonuç (her çağrıda kopyalanır)
+_ZERO_RESULT = MappingProxyType({
+    "stablecoin_supply_ratio": 0.0,
+    "exchange_net_flow": 0.0,
+    "etf_flows": 0.0,
+    "fear_greed_index": 0.0,
+    "aggregate": 0.0,
+})
+
+
+def _normalize_linear(value: float, mid: float, half_range: float) -> float:
+    """
+    Değeri mid etrafında lineer olarak [-1, 1] aralığına map'le.
+    
+    mid'in altındaki değerler pozitif (bullish), üstündekiler negatif (bearish).
+    
+    Args:
+        value: Ham metrik değeri
+        mid: Nötr nokta (0 skor)
+        half_range: ±1'e ulaşılan uzaklık
+        
+    Returns:
+        Clamp'lenmiş skor; half_range <= 0 ise 0.0
+    """
+    if half_range <= 0:
+        return 0.0
+    return max(-1.0, min(1.0, (mid - value) / half_range))
+
+
+def _latest_value(series: Optional[List[Dict[str, Any]]]) -> Optional[float]:
+    """Glassnode {t, v} serisinin son değeri; boş seri veya eksik 'v' → None"""
+    if not series:
+        return None
+    return series[-1].get('v')
+
+
+def _threshold_band(thresholds: Dict[str, float]) -> Tuple[float, float]:
+    """bearish/bullish eşiklerinden (mid, half_range) çifti"""
+    mid = thresholds.get("neutral", (thresholds["bearish"] + thresholds["bullish"]) / 2)
+    return mid, (thresholds["bearish"] - thresholds["bullish"]) / 2
+
+
 class OnchainAnalyzer:
-    _instance: Optional["OnchainAnalyzer"] = None
-    _initialized: bool = False
+    # Ham API yanıtları için TTL (sn): Glassnode 24h bucket'ları günde bir,
+    # Fear & Greed saatlik değişir
+    cache_ttl: float = 3600.0
+    fear_greed_cache_ttl: float = 600.0
+    # Aggregate sonuç TTL (sn): handler burst'lerini tek hesaplamaya indirger
+    aggregate_cache_ttl: float = 60.0
+    # Tek metrik için üst süre sınırı (sn); yavaş endpoint aggregate'i bloklamaz
+    metric_timeout: float = 2.0
+    # Glassnode'a aynı anda açık en fazla istek (rate-limit burst koruması)
+    glassnode_concurrency: int = 5
     
-    def __new__(cls, binance_api: Optional[BinanceAPI] = None, 
-                config: Optional[OnChainConfig] = None) -> "OnchainAnalyzer":
-        """Singleton pattern implementation"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    # Metrik → (API_TIMEOUTS key, FALLBACK_VALUES key)
+    _METRICS: Dict[str, Tuple[str, str]] = {
+        "stablecoin_supply_ratio": ("glassnode", "ssr"),
+        "exchange_net_flow": ("glassnode", "netflow"),
+        "etf_flows": ("binance", "etf_flows"),
+        "fear_greed_index": ("fear_greed", "fear_greed"),
+    }
     
     def __init__(self, binance_api: Optional[BinanceAPI] = None, 
-                 config: Optional[OnChainConfig] = None) -> None:
+                 config: Optional[OnChainConfig] = None,
+                 session: Optional[aiohttp.ClientSession] = None) -> None:
         """
         OnchainAnalyzer initialization with config.
+        
+        Singleton değildir: her bot / BinanceAPI kendi instance'ını (ve HTTP
+        havuzunu, cache'lerini) taşır. Paylaşım için get_onchain_analyzer().
+        
+        Args:
+            binance_api: BinanceAPI instance (opsiyonel)
+            config: OnChainConfig instance (opsiyonel, yoksa ilk kullanımda yüklenir)
+            session: Paylaşılan aiohttp session (opsiyonel, yoksa ilk istekte oluşturulur)
         """
-        if not self._initialized:
-            self.binance = binance_api
-            self.config = config
-            self.session: Optional[aiohttp.ClientSession] = None
-            self._cache: Dict[str, Any] = {}
-            self._cache_timestamps: Dict[str, float] = {}
-            self._initialized = True
-            logger.info("✅ OnchainAnalyzer initialized (config will be loaded on first use)")
-            
-            # Config'i async olarak yükleme işlemini ertele
-            self._config_loaded = False
+        self.binance = binance_api
+        self.config = config
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._glassnode_base = GLASSNODE_BASE_URL
+        self._cache: Dict[str, Any] = {}
+        self._cache_timestamps: Dict[str, float] = {}
+        # Ham yanıt memo'su: {key: (expiry_loop_time, data)} + key başına lock
+        self._fetch_cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._fetch_locks: Dict[Hashable, asyncio.Lock] = {}
+        self._http_sem = asyncio.Semaphore(self.glassnode_concurrency)
+        # Aggregate memo: (loop_time, result) + eşzamanlı çağıranlar için in-flight future
+        self._aggregate_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._aggregate_inflight: Optional[asyncio.Task] = None
+        # _METRICS sırasında normalize ağırlık vektörü (METRIC_WEIGHTS değişince yenilenir)
+        self._weights: Optional[np.ndarray] = None
+        self._weights_source: Optional[Dict[str, float]] = None
+        # Config verildiyse hazır; yoksa ilk kullanımda async yüklenir
+        self._config_loaded = config is not None
+        logger.info("✅ OnchainAnalyzer initialized (config will be loaded on first use)")
     
 
     async def _ensure_config_loaded(self):
@@ -64,11 +147,39 @@ class OnchainAnalyzer:
             self._config_loaded = True
     
     
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """
+        Paylaşılan, keep-alive havuzlu HTTP session'ı döndür.
+        
+        Glassnode ve alternative.me istekleri aynı connector'ı kullanır;
+        TCP/TLS el sıkışması ve DNS çözümlemesi yalnızca ilk istekte ödenir.
+        
+        Returns:
+            Active aiohttp session
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                # İki sabit host (glassnode, alternative.me): DNS oturum boyunca bir kez çözülür
+                resolver=AsyncResolver() if AsyncResolver is not None else None,
+                use_dns_cache=True,
+                ttl_dns_cache=3600,
+                keepalive_timeout=75
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+                raise_for_status=False
+            )
+            logger.info("OnchainAnalyzer HTTP session created")
+        return self.session
+
     async def _get_cached_data(self, key: str, ttl: int) -> Optional[Any]:
         """Cache'ten veri al"""
         current_time = time.time()
         if key in self._cache and current_time - self._cache_timestamps[key] < ttl:
-            logger.debug(f"Cache hit for {key}")
+            logger.debug("Cache hit for %s", key)
             return self._cache[key]
         return None
 
@@ -76,11 +187,44 @@ class OnchainAnalyzer:
         """Cache'e veri kaydet"""
         self._cache[key] = data
         self._cache_timestamps[key] = time.time()
-        logger.debug(f"Cache set for {key}")
+        logger.debug("Cache set for %s", key)
+
+    async def _memoized(self, key: Hashable, ttl: float,
+                        fetch: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """
+        Async TTL memoization; aynı key için eşzamanlı miss'ler tek fetch paylaşır.
+        
+        Args:
+            key: Cache key
+            ttl: Time-to-live (saniye)
+            fetch: Miss durumunda çağrılacak coroutine factory
+            
+        Returns:
+            Cached or freshly fetched data (None sonuçlar cache'lenmez)
+        """
+        loop = asyncio.get_running_loop()
+        cached = self._fetch_cache.get(key)
+        if cached and cached[0] > loop.time():
+            return cached[1]
+        
+        lock = self._fetch_locks.get(key)
+        if lock is None:
+            lock = self._fetch_locks[key] = asyncio.Lock()
+        
+        async with lock:
+            # Double-check: lock beklenirken başka çağıran doldurmuş olabilir
+            cached = self._fetch_cache.get(key)
+            if cached and cached[0] > loop.time():
+                return cached[1]
+            
+            data = await fetch()
+            if data is not None:
+                self._fetch_cache[key] = (loop.time() + ttl, data)
+            return data
 
     async def _get_glassnode_data(self, endpoint: str, params: Dict[str, Any]) -> Optional[List[Dict]]:
         """
-        Glassnode API'den veri çekme
+        Glassnode API'den veri çekme (TTL memo'lu)
         
         Args:
             endpoint: API endpoint
@@ -89,16 +233,24 @@ class OnchainAnalyzer:
         Returns:
             API response data or None
         """
+        # s/u zaman penceresi her çağrıda değişir → key'e dahil edilmez
+        key = (endpoint, tuple(sorted((k, v) for k, v in params.items() if k not in ('s', 'u'))))
+        return await self._memoized(
+            key, self.cache_ttl, lambda: self._fetch_glassnode_data(endpoint, params)
+        )
+
+    async def _fetch_glassnode_data(self, endpoint: str, params: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Glassnode API'ye tek HTTP isteği"""
         try:
-            await self._ensure_session()
-            
-            base_url = "https://api.glassnode.com/v1"
-            params['api_key'] = self.config.GLASSNODE_API_KEY
+            session = await self._ensure_session()
+            # Çağıranın dict'i değiştirilmez: aynı params eşzamanlı isteklerde paylaşılır
+            params = {**params, 'api_key': self.config.GLASSNODE_API_KEY}
             
-            async with self.session.get(f"{base_url}/{endpoint}", params=params) as response:
+            async with self._http_sem, \
+                    session.get(f"{self._glassnode_base}/{endpoint}", params=params) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    return data
+                    # Ham byte'lar doğrudan hızlı decoder'a (orjson varsa)
+                    return json_loads(await response.read())
                 else:
                     logger.error(f"Glassnode API error: {response.status}")
                     return None
@@ -108,7 +260,12 @@ class OnchainAnalyzer:
             return None
 
     async def stablecoin_supply_ratio(self) -> float:
-        """Stablecoin Supply Ratio hesaplama"""
+        """
+        Stablecoin Supply Ratio hesaplama
+        
+        Returns:
+            Normalize SSR skoru (-1 ile +1 arası)
+        """
         try:
             await self._ensure_config_loaded()  # ✅ Config yüklendiğinden emin ol
             # Cache kontrolü
@@ -119,67 +276,45 @@ class OnchainAnalyzer:
             if cached_data is not None:
                 return cached_data
             
-            # Glassnode API'den SSR verisi al
-            params = {
-                'a': 'BTC',
-                'i': '24h',
-                's': int(time.time()) - 86400 * 7,  # 7 günlük veri
-                'u': int(time.time())
-            }
-            
-            ssr_data = await self._get_glassnode_data("metrics/indicators/ssr", params)
-            
-            if ssr_data and len(ssr_data) > 0:
-                latest_ssr = ssr_data[-1]['v']
-                ssr_thresholds = self.config.SSR_THRESHOLDS
+            # Cache miss: Binance fallback fiyatı Glassnode isteğiyle eşzamanlı başlar;
+            # Glassnode boş dönerse ikinci bir round-trip seri beklenmez
+            btc_price = asyncio.ensure_future(self.binance.get_price("BTCUSDT")) if self.binance else None
+            try:
+                # Glassnode API'den SSR verisi al
+                now = int(time.time())
+                params = {
+                    'a': 'BTC',
+                    'i': '24h',
+                    's': now - GLASSNODE_LATEST_WINDOW,
+                    'u': now
+                }
                 
-                # Threshold'lara göre normalize et
-                if latest_ssr > ssr_thresholds["bearish"]:
-                    result = -1.0
-                elif latest_ssr < ssr_thresholds["bullish"]:
-                    result = 1.0
-                else:
-                    # Linear normalization between thresholds
-                    neutral_range = ssr_thresholds["bearish"] - ssr_thresholds["bullish"]
-                    if neutral_range > 0:
-                        result = ((ssr_thresholds["neutral"] - latest_ssr) / neutral_range) * 2
-                    else:
-                        result = 0.0
+                ssr_data = await self._get_glassnode_data("metrics/indicators/ssr", params)
                 
-                result = max(-1.0, min(1.0, result))  # Clamp to [-1, 1]
+                latest_ssr = _latest_value(ssr_data)
                 
-                await self._set_cached_data(cache_key, result)
-                logger.info(f"SSR calculated: {latest_ssr:.2f} → {result:.3f}")
-                return result
+                if latest_ssr is not None:
+                    # Threshold'lara göre normalize et
+                    result = _normalize_linear(latest_ssr, *_threshold_band(self.config.SSR_THRESHOLDS))
+                    
+                    await self._set_cached_data(cache_key, result)
+                    logger.info("SSR calculated: %.2f → %.3f", latest_ssr, result)
+                    return result
                 
-            else:
                 # Fallback: Binance API ile basit hesaplama
-                if self.binance:
+                if btc_price is not None:
                     try:
-                        btc_price = await self.binance.get_symbol_ticker("BTCUSDT")
-                        if btc_price and 'price' in btc_price:
-                            btc_price_val = float(btc_price['price'])
+                        btc_price_val = await btc_price
+                        if btc_price_val:
                             # Basit SSR hesaplama (örnek)
                             btc_market_cap = btc_price_val * 19500000  # ~19.5M BTC
                             usdt_supply = 80000000000  # ~80B USDT
                             ssr = btc_market_cap / usdt_supply
                             
-                            ssr_thresholds = self.config.SSR_THRESHOLDS
                             # Normalize
-                            if ssr > ssr_thresholds["bearish"]:
-                                result = -1.0
-                            elif ssr < ssr_thresholds["bullish"]:
-                                result = 1.0
-                            else:
-                                neutral_range = ssr_thresholds["bearish"] - ssr_thresholds["bullish"]
-                                if neutral_range > 0:
-                                    result = ((ssr_thresholds["neutral"] - ssr) / neutral_range) * 2
-                                else:
-                                    result = 0.0
-                            
-                            result = max(-1.0, min(1.0, result))
+                            result = _normalize_linear(ssr, *_threshold_band(self.config.SSR_THRESHOLDS))
                             await self._set_cached_data(cache_key, result)
-                            logger.info(f"SSR fallback: {ssr:.2f} → {result:.3f}")
+                            logger.info("SSR fallback: %.2f → %.3f", ssr, result)
                             return result
                     except Exception as binance_error:
                         logger.warning(f"Binance fallback failed: {binance_error}")
@@ -188,6 +323,10 @@ class OnchainAnalyzer:
                 result = self.config.FALLBACK_VALUES["ssr"]
                 await self._set_cached_data(cache_key, result)
                 return result
+            finally:
+                # Glassnode yanıt verdiyse, hata veya iptal olduysa fiyat task'ı sahipsiz kalmaz
+                if btc_price is not None and not btc_price.done():
+                    btc_price.cancel()
                 
         except Exception as e:
             logger.error(f"SSR calculation error: {e}")
@@ -204,38 +343,30 @@ class OnchainAnalyzer:
                 return cached_data
             
             # Glassnode API'den exchange flow verisi
+            now = int(time.time())
             params = {
                 'a': 'BTC',
                 'i': '24h',
-                's': int(time.time()) - 86400 * 3,  # 3 günlük veri
-                'u': int(time.time())
+                's': now - GLASSNODE_LATEST_WINDOW,
+                'u': now
             }
             
-            inflow_data = await self._get_glassnode_data("metrics/transactions/transfers_volume_to_exchanges", params)
-            outflow_data = await self._get_glassnode_data("metrics/transactions/transfers_volume_from_exchanges", params)
+            # Giriş/çıkış serileri aynı havuz üzerinden eşzamanlı çekilir
+            inflow_data, outflow_data = await asyncio.gather(
+                self._get_glassnode_data("metrics/transactions/transfers_volume_to_exchanges", params),
+                self._get_glassnode_data("metrics/transactions/transfers_volume_from_exchanges", params)
+            )
+            
+            latest_inflow = _latest_value(inflow_data)
+            latest_outflow = _latest_value(outflow_data)
             
-            if inflow_data and outflow_data and len(inflow_data) > 0 and len(outflow_data) > 0:
-                latest_inflow = inflow_data[-1]['v']
-                latest_outflow = outflow_data[-1]['v']
+            if latest_inflow is not None and latest_outflow is not None:
                 net_flow = latest_inflow - latest_outflow
                 
-                # Threshold'lara göre normalize et
-                thresholds = self.config.NETFLOW_THRESHOLDS
-                if net_flow > thresholds["bearish"]:
-                    result = -1.0
-                elif net_flow < thresholds["bullish"]:
-                    result = 1.0
-                else:
-                    # Linear normalization
-                    range_size = thresholds["bearish"] - thresholds["bullish"]
-                    if range_size > 0:
-                        result = -((net_flow - thresholds["bullish"]) / range_size) * 2
-                    else:
-                        result = 0.0
-                
-                result = max(-1.0, min(1.0, result))
+                # Threshold'lara göre normalize et (net inflow → bearish)
+                result = _normalize_linear(net_flow, *_threshold_band(self.config.NETFLOW_THRESHOLDS))
                 await self._set_cached_data(cache_key, result)
-                logger.info(f"Net flow calculated: {net_flow:.0f} → {result:.3f}")
+                logger.info("Net flow calculated: %.0f → %.3f", net_flow, result)
                 return result
             else:
                 result = self.config.FALLBACK_VALUES["netflow"]
@@ -260,15 +391,10 @@ class OnchainAnalyzer:
             # Şimdilik simüle edilmiş veri
             simulated_flow = np.random.uniform(-50000000, 50000000)
             
-            threshold = self.config.ETF_THRESHOLDS["max_flow"]
-            if abs(simulated_flow) > threshold:
-                result = 1.0 if simulated_flow > 0 else -1.0
-            else:
-                result = simulated_flow / threshold
-            
-            result = max(-1.0, min(1.0, result))
+            # ETF girişi bullish → işaret ters çevrilerek normalize edilir
+            result = _normalize_linear(-simulated_flow, 0.0, self.config.ETF_THRESHOLDS["max_flow"])
             await self._set_cached_data(cache_key, result)
-            logger.info(f"ETF flows simulated: {simulated_flow:.0f} → {result:.3f}")
+            logger.info("ETF flows simulated: %.0f → %.3f", simulated_flow, result)
             return result
             
         except Exception as e:
@@ -286,20 +412,17 @@ class OnchainAnalyzer:
                 return cached_data
             
             # Alternative.me Fear and Greed Index API
-            await self._ensure_session()
-            url = "https://api.alternative.me/fng/"
-            
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data and 'data' in data and len(data['data']) > 0:
-                        fgi_value = int(data['data'][0]['value'])
-                        # Normalize: 0-100 → -1 to +1
-                        result = (fgi_value - 50) / 50
-                        result = max(-1.0, min(1.0, result))
-                        await self._set_cached_data(cache_key, result)
-                        logger.info(f"Fear & Greed Index: {fgi_value} → {result:.3f}")
-                        return result
+            data = await self._memoized(
+                FEAR_GREED_URL, self.fear_greed_cache_ttl, self._fetch_fear_greed_data
+            )
+            if data and 'data' in data and len(data['data']) > 0:
+                fgi_value = int(data['data'][0]['value'])
+                # Normalize: 0-100 → -1 to +1
+                result = (fgi_value - 50) / 50
+                result = max(-1.0, min(1.0, result))
+                await self._set_cached_data(cache_key, result)
+                logger.info("Fear & Greed Index: %d → %.3f", fgi_value, result)
+                return result
             
             # Fallback
             result = self.config.FALLBACK_VALUES["fear_greed"]
@@ -310,41 +433,116 @@ class OnchainAnalyzer:
             logger.error(f"Fear & Greed Index error: {e}")
             return self.config.FALLBACK_VALUES["fear_greed"]
 
+    async def _fetch_fear_greed_data(self) -> Optional[Dict[str, Any]]:
+        """alternative.me Fear & Greed API'ye tek HTTP isteği"""
+        session = await self._ensure_session()
+        async with session.get(FEAR_GREED_URL) as response:
+            if response.status == 200:
+                return json_loads(await response.read())
+            logger.error(f"Fear & Greed API error: {response.status}")
+            return None
+
     async def aggregate_score(self) -> Dict[str, Any]:
-        """Tüm metrikleri toplu olarak hesapla ve aggregate score üret"""
-        try:
-            weights = self.config.METRIC_WEIGHTS
-            
-            # Tüm metrikleri paralel çalıştır
-            tasks = {
-                "stablecoin_supply_ratio": self.stablecoin_supply_ratio(),
-                "exchange_net_flow": self.exchange_net_flow(),
-                "etf_flows": self.etf_flows(),
-                "fear_greed_index": self.fear_greed_index()
-            }
+        """
+        Tüm metrikleri toplu olarak hesapla ve aggregate score üret.
+        
+        Sonuç aggregate_cache_ttl boyunca cache'lenir; hesaplama tek bir paylaşılan
+        task'ta çalışır ve tüm çağıranlar (ilki dahil) onu shield ile bekler: bir
+        çağıranın iptali diğerlerinin sonucunu iptal etmez. BinanceAPI bağlı değilse hiçbir
+        metrik (Fear & Greed dahil) çalıştırılmaz; nötr sonuç döner.
+        
+        Returns:
+            Metrik skorları, aggregate ve timestamp içeren dict
+        """
+        if self.binance is None:
+            logger.warning("OnchainAnalyzer: BinanceAPI not set, returning neutral result")
+            return {**_ZERO_RESULT, "timestamp": time.time(), "error": "BinanceAPI not set"}
+        
+        loop = asyncio.get_running_loop()
+        cached = self._aggregate_cache
+        if cached and loop.time() - cached[0] < self.aggregate_cache_ttl:
+            return cached[1]
+        
+        task = self._aggregate_inflight
+        if task is None:
+            task = asyncio.ensure_future(self._compute_and_cache_aggregate())
+            self._aggregate_inflight = task
+            task.add_done_callback(self._aggregate_done)
+        
+        return await asyncio.shield(task)
+
+    async def _compute_and_cache_aggregate(self) -> Dict[str, Any]:
+        """Paylaşılan aggregate task'ının gövdesi: hesapla, hatasızsa cache'le"""
+        result = await self._compute_aggregate_score()
+        if "error" not in result:
+            self._aggregate_cache = (asyncio.get_running_loop().time(), result)
+        return result
+
+    def _aggregate_done(self, task: asyncio.Task) -> None:
+        """In-flight task'ı bırak; bekleyen kalmadıysa exception'ı retrieved işaretle"""
+        if self._aggregate_inflight is task:
+            self._aggregate_inflight = None
+        if not task.cancelled():
+            task.exception()
+
+    async def _guarded(self, name: str, coro: Awaitable[float]) -> float:
+        """
+        Metrik coroutine'ini timeout ile çalıştır; hata/timeout'ta fallback döndür.
+        
+        Args:
+            name: Metrik adı (_METRICS key'i)
+            coro: Metrik coroutine'i
             
-            results = {}
-            for name, task in tasks.items():
-                try:
-                    # Timeout yönetimi
-                    timeout = self.config.API_TIMEOUTS.get(name.split('_')[0], 30)
-                    results[name] = await asyncio.wait_for(task, timeout=timeout)
-                except asyncio.TimeoutError:
-                    logger.warning(f"{name} timeout after {timeout}s, using fallback")
-                    results[name] = self.config.FALLBACK_VALUES.get(name, 0.0)
-                except Exception as e:
-                    logger.error(f"{name} calculation error: {e}")
-                    results[name] = self.config.FALLBACK_VALUES.get(name, 0.0)
-
-            # Ağırlıklı ortalama
-            total_weight = sum(weights.values())
-            if total_weight > 0:
-                weighted_sum = sum(results[name] * weights.get(name, 0.0) for name in results)
-                aggregate_score = weighted_sum / total_weight
-            else:
-                aggregate_score = sum(results.values()) / len(results)
+        Returns:
+            Metrik skoru veya config fallback değeri
+        """
+        timeout_key, fallback_key = self._METRICS[name]
+        timeout = min(self.config.API_TIMEOUTS.get(timeout_key, 30), self.metric_timeout)
+        try:
+            async with asyncio.timeout(timeout):
+                return await coro
+        except TimeoutError:
+            logger.warning(f"{name} timeout after {timeout}s, using fallback")
+        except Exception as e:
+            logger.error(f"{name} calculation error: {e}")
+        return self.config.FALLBACK_VALUES.get(fallback_key, 0.0)
+
+    def _weight_vector(self) -> np.ndarray:
+        """
+        METRIC_WEIGHTS'ten _METRICS sırasında, toplamı 1 olan ağırlık vektörü.
+        
+        Config dict'i değişmedikçe (identity) önceki vektör yeniden kullanılır.
+        
+        Returns:
+            float64 ağırlık vektörü
+        """
+        weights = self.config.METRIC_WEIGHTS
+        if self._weights is None or self._weights_source is not weights:
+            vector = np.fromiter(
+                (weights.get(name, 0.0) for name in self._METRICS),
+                dtype=np.float64, count=len(self._METRICS)
+            )
+            total = vector.sum()
+            # Ağırlık yoksa eşit ağırlıklı ortalama
+            self._weights = vector / total if total > 0 else np.full(len(vector), 1.0 / len(vector))
+            self._weights_source = weights
+        return self._weights
+
+    async def _compute_aggregate_score(self) -> Dict[str, Any]:
+        """Aggregate score'un cache'siz hesaplaması"""
+        try:
+            await self._ensure_config_loaded()
             
-            aggregate_score = round(aggregate_score, 3)
+            # Tüm metrikleri paralel çalıştır; her biri kendi timeout'u ile korunur
+            names = tuple(self._METRICS)
+            values = await asyncio.gather(
+                *(self._guarded(name, getattr(self, name)()) for name in names)
+            )
+            results = dict(zip(names, values))
+
+            # Ağırlıklı ortalama: normalize ağırlık vektörü · skor vektörü
+            scores = np.fromiter(values, dtype=np.float64, count=len(names))
+            aggregate_score = round(float(self._weight_vector() @ scores), 3)
 
             result = {
                 **results,
@@ -352,7 +550,7 @@ class OnchainAnalyzer:
                 "timestamp": time.time()
             }
             
-            logger.info(f"📊 On-chain analysis complete: {aggregate_score:.3f}")
+            logger.info("📊 On-chain analysis complete: %.3f", aggregate_score)
             return result
             
         except Exception as e:
@@ -369,10 +567,20 @@ class OnchainAnalyzer:
             }
 
     async def close(self) -> None:
-        """Kaynakları temizle"""
+        """
+        Kaynakları temizle (idempotent).
+        
+        Uygulama shutdown hook'undan açıkça çağrılır; GC/__del__ üzerinden
+        loop'a coroutine planlanmaz.
+        """
+        task = self._aggregate_inflight
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
         if self.session and not self.session.closed:
             await self.session.close()
             logger.info("OnchainAnalyzer session closed")
+        self.session = None
 
 # Aiogram 3.x Router entegrasyonu
 from aiogram import Router, F
@@ -380,55 +588,68 @@ from aiogram.types import Message
 
 router = Router()
 
+# Handler yanıt şablonu; aggregate_score sonucu ile tek format_map çağrısı
+_ONCHAIN_TEMPLATE = (
+    "🔗 **On-Chain Analiz**\n\n"
+    "• 📊 **Stablecoin Supply Ratio**: `{stablecoin_supply_ratio:.3f}`\n"
+    "• 💸 **Exchange Net Flow**: `{exchange_net_flow:.3f}`\n"
+    "• 📈 **ETF Flows**: `{etf_flows:.3f}`\n"
+    "• 😨 **Fear & Greed**: `{fear_greed_index:.3f}`\n\n"
+    "⭐ **Genel Skor**: `{aggregate:.3f}`"
+)
+
 @router.message(F.text.lower() == "onchain")
 async def onchain_handler(message: Message) -> None:
     """Telegram bot için On-chain analiz handler"""
     try:
-        # Bot'tan analyzer instance'ını al veya oluştur
-        analyzer = getattr(message.bot, 'onchain_analyzer', None)
-        if analyzer is None:
-            binance_api = getattr(message.bot, 'binance_api', None)
-            if not binance_api:
-                await message.answer("❌ Binance API bağlantısı kurulamadı")
-                return
-            
-            analyzer = get_onchain_analyzer(binance_api)
-            message.bot.onchain_analyzer = analyzer
+        binance_api = getattr(message.bot, 'binance_api', None)
+        if not binance_api:
+            await message.answer("❌ Binance API bağlantısı kurulamadı")
+            return
+        
+        # AnalysisAggregator ile aynı instance: BinanceAPI başına tek session/cache
+        analyzer = get_onchain_analyzer(binance_api)
         
         await message.answer("🔍 On-chain veriler hesaplanıyor...")
         
         result = await analyzer.aggregate_score()
 
         # Sonuçları formatla
-        text = (
-            "🔗 **On-Chain Analiz**\n\n"
-            f"• 📊 **Stablecoin Supply Ratio**: `{result['stablecoin_supply_ratio']:.3f}`\n"
-            f"• 💸 **Exchange Net Flow**: `{result['exchange_net_flow']:.3f}`\n"
-            f"• 📈 **ETF Flows**: `{result['etf_flows']:.3f}`\n"
-            f"• 😨 **Fear & Greed**: `{result['fear_greed_index']:.3f}`\n\n"
-            f"⭐ **Genel Skor**: `{result['aggregate']:.3f}`"
-        )
-
-        await message.answer(text)
+        await message.answer(_ONCHAIN_TEMPLATE.format_map(result))
         
     except Exception as e:
         logger.error(f"Onchain handler error: {e}")
         await message.answer("❌ On-chain analiz sırasında hata oluştu")
 
-# Singleton instance getter
+# BinanceAPI başına paylaşılan instance'lar (identity key)
+_analyzers: Dict[Optional[BinanceAPI], OnchainAnalyzer] = {}
+
 def get_onchain_analyzer(binance_api: Optional[BinanceAPI] = None, 
                          config: Optional[OnChainConfig] = None) -> OnchainAnalyzer:
     """
-    OnchainAnalyzer singleton instance'ını döndürür.
+    BinanceAPI instance'ına bağlı OnchainAnalyzer'ı döndürür (yoksa oluşturur).
     
     Args:
         binance_api: BinanceAPI instance (opsiyonel)
-        config: OnChainConfig instance (opsiyonel)
+        config: OnChainConfig instance (opsiyonel; verilirse mevcut instance'a uygulanır)
         
     Returns:
-        OnchainAnalyzer instance
+        OnchainAnalyzer instance (BinanceAPI başına bir tane)
     """
-    return OnchainAnalyzer(binance_api, config)
+    analyzer = _analyzers.get(binance_api)
+    if analyzer is None:
+        analyzer = _analyzers[binance_api] = OnchainAnalyzer(binance_api, config)
+    elif config is not None:
+        analyzer.config = config
+        analyzer._config_loaded = True
+    return analyzer
+
+async def close_onchain_analyzers() -> None:
+    """Paylaşılan tüm OnchainAnalyzer instance'larını kapat ve registry'i temizle"""
+    analyzers = list(_analyzers.values())
+    _analyzers.clear()
+    for analyzer in analyzers:
+        await analyzer.close()
 
 # Test fonksiyonu
 async def test_onchain_analyzer():
@@ -436,8 +657,8 @@ async def test_onchain_analyzer():
     try:
         # Mock BinanceAPI için basit bir sınıf
         class MockBinanceAPI:
-            async def get_symbol_ticker(self, symbol: str) -> Optional[Dict]:
-                return {'price': '45000.0'} if symbol == "BTCUSDT" else None
+            async def get_price(self, symbol: str) -> Optional[float]:
+                return 45000.0 if symbol == "BTCUSDT" else None
         
         analyzer = get_onchain_analyzer(MockBinanceAPI())
         result = await analyzer.aggregate_score()
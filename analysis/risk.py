@@ -35,27 +35,28 @@ import asyncio
 import logging
 import os
 import time
+import weakref
+from types import MappingProxyType
 from math import erf, sqrt
-from statistics import mean, pstdev
-from typing import Dict, List, Optional, Sequence, Tuple, Union, Any
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union, Any
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+from functools import lru_cache, partial
 
 import aiohttp
+import numpy as np
 import pandas as pd
+import yarl
 
-# Conditional imports for optional dependencies
-try:
+from utils.binance.binance_json import loads as json_loads
+
+# aiogram yalnızca router istendiğinde import edilir (bkz. get_router);
+# Telegram'sız risk hesaplamaları aiogram yükünü taşımaz
+if TYPE_CHECKING:
     from aiogram import Router
-    from aiogram.filters import Command
-    from aiogram.types import Message
-    AIOGRAM_AVAILABLE = True
-except ImportError:
-    AIOGRAM_AVAILABLE = False
-    Router = None
-    Command = None
-    Message = None
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +68,16 @@ DEFAULT_MACRO_WEIGHT = 0.15
 DEFAULT_MACRO_CACHE_TIMEOUT = 3600  # 1 saat cache
 DEFAULT_REQUEST_TIMEOUT = 30
 DEFAULT_MAX_RETRIES = 3
+DEFAULT_MACRO_FETCH_TIMEOUT = 3  # makro alt metrik başına üst süre (sn)
+DEFAULT_GLASSNODE_WINDOW = 86400 * 3  # yalnızca son değer okunur → son ~3 günlük seri yeter
+DEFAULT_MAX_RESPONSE_BYTES = 5_000_000  # makro API yanıtı için üst boyut
+# Makro API istekleri için istek başına timeout (session'ın genel timeout'undan sıkı)
+MACRO_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=2)
+DEFAULT_KLINES_CACHE_TTL = 60  # kline cache (sn); 1h+ mumlar için yeterince taze
+# Sembol/interval başına tek kline serisi bu uzunlukta çekilir (en büyük tüketici:
+# VaR 250 return + 1); ATR/korelasyon aynı serinin kuyruğunu kullanır
+KLINES_FETCH_LIMIT = 251
+DEFAULT_MAX_CACHE_SIZE = 1000  # BotConfig.MAX_CACHE_SIZE ile aynı varsayılan
 
 @dataclass
 class RiskManagerConfig:
@@ -79,12 +90,14 @@ class RiskManagerConfig:
     glassnode_api_key: Optional[str] = None
     request_timeout: int = DEFAULT_REQUEST_TIMEOUT
     max_retries: int = DEFAULT_MAX_RETRIES
+    klines_cache_ttl: int = DEFAULT_KLINES_CACHE_TTL
+    max_cache_size: int = DEFAULT_MAX_CACHE_SIZE
     enable_macro_analysis: bool = True
     enable_advanced_metrics: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class MacroMarketSignal:
-    """Makro piyasa sinyallerini tutan veri sınıfı"""
+    """Makro piyasa sinyallerini tutan veri sınıfı (slots: cache'te __dict__'siz tutulur)"""
     ssr_score: float = 0.0  # -1 (bearish) to +1 (bullish)
     netflow_score: float = 0.0
     etf_flow_score: float = 0.0
@@ -109,8 +122,47 @@ class RiskMetrics:
     score_without_macro: float = 0.0
     market_regime: str = "NEUTRAL"
     recommendation: str = "NEUTRAL"
+    macro_signal: Optional[MacroMarketSignal] = None  # include_macro=True ise hesaplanan sinyal
     timestamp: datetime = field(default_factory=datetime.now)
 
+async def _read_json(response: aiohttp.ClientResponse) -> Optional[Any]:
+    """
+    Yanıt gövdesini boyut kontrolüyle JSON olarak oku.
+    
+    Content-Length DEFAULT_MAX_RESPONSE_BYTES'ı aşıyorsa gövde okunmaz; bağlantı
+    havuza hızla geri döner.
+    
+    Returns:
+        Decode edilmiş JSON veya boyut aşımında None
+    """
+    if response.content_length and response.content_length > DEFAULT_MAX_RESPONSE_BYTES:
+        logger.warning("⚠️ Response too large (%s bytes): %s", response.content_length, response.url)
+        return None
+    return json_loads(await response.read())
+
+async def _none() -> None:
+    """gather içinde atlanan (devre dışı) bir alt hesaplamanın yer tutucusu"""
+    return None
+
+async def _safe(coro, default: Any, timeout: float = DEFAULT_MACRO_FETCH_TIMEOUT) -> Any:
+    """
+    Coroutine'i timeout ile çalıştır; hata veya timeout'ta default döndür.
+    
+    Args:
+        coro: Çalıştırılacak coroutine
+        default: Hata/timeout durumunda dönülecek değer
+        timeout: Üst süre (saniye)
+        
+    Returns:
+        Coroutine sonucu veya default
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            return await coro
+    except Exception as e:
+        logger.warning("⚠️ Macro sub-metric failed, using default: %r", e)
+        return default
+
 class CircuitBreaker:
     """Basit circuit breaker implementasyonu"""
     def __init__(self, failure_threshold: int = 5, reset_timeout: int = 60):
@@ -149,69 +201,183 @@ class RiskManager:
     """
     Geliştirilmiş Risk Manager with macro market analysis integration.
     
-    Singleton pattern with async context manager support.
+    BinanceAPI client'ı başına tek instance (aynı client → aynı session/cache,
+    farklı client → ayrı manager) with async context manager support.
     """
 
-    _instance: Optional[RiskManager] = None
-    _initialized: bool = False
+    # id(binance_api) → manager; manager client'ı güçlü referansla tuttuğundan
+    # id, manager yaşadığı sürece yeniden kullanılamaz
+    _instances: "weakref.WeakValueDictionary[int, RiskManager]" = weakref.WeakValueDictionary()
     _initialization_lock = asyncio.Lock()
+    
+    # Makro API uç noktaları (parse edilmiş URL'ler; istek başına string birleştirme yok)
+    _GLASSNODE_BASE = yarl.URL("https://api.glassnode.com/v1/")
+    _FEAR_GREED_URL = yarl.URL("https://api.alternative.me/fng/")
+    # SSR / netflow için sabit sorgu parametreleri
+    _GLASSNODE_BTC_DAILY = MappingProxyType({'a': 'BTC', 'i': '24h'})
+    
+    # Mikro bileşen ağırlıkları: vol, liq, corr, var (macro ağırlığı config'ten)
+    _MICRO_WEIGHTS: Tuple[float, ...] = (0.30, 0.20, 0.20, 0.20)
+
+    def __new__(cls, binance_api=None, config: Optional[RiskManagerConfig] = None):
+        """Per-client singleton: aynı BinanceAPI için mevcut instance döner"""
+        key = id(binance_api)
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._initialize(binance_api, config)
+            cls._instances[key] = instance
+        elif config is not None:
+            instance.config = config
+        return instance
 
-    def __new__(cls, *args, **kwargs):
-        """Singleton pattern implementation"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self, binance_api=None, config: Optional[RiskManagerConfig] = None):
-        """Initialize risk manager (thread-safe)"""
-        if not self._initialized:
-            self._binance_api = binance_api
-            self.config = config or RiskManagerConfig()
-            self._session: Optional[aiohttp.ClientSession] = None
-            self._circuit_breaker = CircuitBreaker()
-            self._cache: Dict[str, Tuple[Any, float]] = {}
-            self._initialized = True
-            logger.info("✅ RiskManager initialized successfully")
+    def _initialize(self, binance_api, config: Optional[RiskManagerConfig]) -> None:
+        """İlk kurulum (instance başına bir kez)"""
+        if getattr(self, "_initialized", False):
+            return
+        self._binance_api = binance_api
+        self.config = config or RiskManagerConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._circuit_breaker = CircuitBreaker()
+        # TTL + LRU: SCAN_SYMBOLS taraması boyunca sınırsız büyümez
+        self._cache: OrderedDict[Any, Tuple[Any, float]] = OrderedDict()
+        # Makro sinyal yeniden hesaplaması tek seferde yapılır (stampede koruması)
+        self._macro_lock = asyncio.Lock()
+        # close() sırasında iptal edilecek arka plan task'ları (tamamlananlar GC ile düşer)
+        self._tasks: weakref.WeakSet[asyncio.Task] = weakref.WeakSet()
+        # Eşzamanlı kline cache miss'leri tek isteği paylaşır: key → (limit, task)
+        self._klines_inflight: Dict[Tuple, Tuple[int, asyncio.Task]] = {}
+        # Normalize skor ağırlık vektörü; macro_weight değişince yeniden kurulur
+        self._score_weights_vec: Optional[np.ndarray] = None
+        self._score_weights_macro: Optional[float] = None
+        self._initialized = True
+        logger.info("✅ RiskManager initialized successfully")
 
     async def initialize(self, binance_api, config: Optional[RiskManagerConfig] = None):
-        """Async initialization method"""
+        """Async initialization: verilen bağımlılıkları instance'a bağlar"""
         async with self._initialization_lock:
-            if not self._initialized:
+            if binance_api is not None:
                 self._binance_api = binance_api
-                self.config = config or RiskManagerConfig()
-                self._session = None
-                self._circuit_breaker = CircuitBreaker()
-                self._cache = {}
-                self._initialized = True
-                logger.info("✅ RiskManager async initialization completed")
+            if config is not None:
+                self.config = config
+            logger.info("✅ RiskManager async initialization completed")
 
     @classmethod
     async def create(cls, binance_api, config: Optional[RiskManagerConfig] = None) -> RiskManager:
         """Factory method for async creation"""
-        instance = cls()
-        await instance.initialize(binance_api, config)
-        return instance
+        return cls(binance_api, config)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """close() ile iptal edilebilmesi için takip edilen task oluşturur"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        return task
+
+    def _score_weights(self) -> np.ndarray:
+        """
+        [vol, liq, corr, var, macro] ağırlık vektörü (toplamı 1'e normalize).
+        
+        Returns:
+            float64 ağırlık vektörü (config.macro_weight değişmedikçe aynı dizi)
+        """
+        macro_weight = self.config.macro_weight
+        if self._score_weights_vec is None or self._score_weights_macro != macro_weight:
+            weights = np.array([*self._MICRO_WEIGHTS, macro_weight], dtype=np.float64)
+            self._score_weights_vec = weights / weights.sum()
+            self._score_weights_macro = macro_weight
+        return self._score_weights_vec
 
     async def _ensure_session(self) -> aiohttp.ClientSession:
-        """Ensure HTTP session is available"""
+        """
+        Ensure HTTP session is available.
+        
+        Lazy oluşturulur (çalışan loop'a bağlanır) ve keep-alive havuzlu connector
+        kullanır; Glassnode / alternative.me için TCP+TLS el sıkışması ve DNS
+        çözümlemesi istekler arasında paylaşılır.
+        """
         if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                enable_cleanup_closed=True
+            )
             timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"Connection": "keep-alive"}
+            )
         return self._session
 
-    async def _cached_get(self, key: str, ttl: int) -> Optional[Any]:
-        """Get cached data with TTL"""
+    async def _cached_get(self, key: Any, ttl: int) -> Optional[Any]:
+        """Get cached data with TTL (monotonic clock; sistem saati kaymasından etkilenmez)"""
         if key in self._cache:
             data, timestamp = self._cache[key]
-            if time.time() - timestamp < ttl:
+            if time.monotonic() - timestamp < ttl:
+                self._cache.move_to_end(key)
                 return data
             else:
                 del self._cache[key]
         return None
 
-    async def _cached_set(self, key: str, data: Any):
-        """Set data in cache"""
-        self._cache[key] = (data, time.time())
+    async def _cached_set(self, key: Any, data: Any):
+        """Set data in cache (LRU: max_cache_size aşılınca en eskiyi at)"""
+        self._cache[key] = (data, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.config.max_cache_size:
+            self._cache.popitem(last=False)
+
+    async def _cached_klines(self, symbol: str, interval: str, limit: int,
+                             futures: bool = False) -> Optional[List[list]]:
+        """
+        Kline verisini TTL+LRU cache üzerinden getir.
+        
+        Sembol/interval başına tek seri (en az KLINES_FETCH_LIMIT mum) cache'lenir;
+        farklı limit isteyen tüketiciler aynı serinin son `limit` mumunu alır.
+        Eşzamanlı cache miss'ler tek Binance isteğini paylaşır.
+        
+        Args:
+            symbol: Trading pair
+            interval: Kline interval
+            limit: Kline sayısı
+            futures: Futures piyasası mı
+            
+        Returns:
+            Raw klines (en fazla limit adet) or None
+        """
+        key = ("klines", symbol, interval, futures)
+        cached = await self._cached_get(key, self.config.klines_cache_ttl)
+        if cached is not None and cached[0] >= limit:
+            return cached[1][-limit:]
+        
+        pending = self._klines_inflight.get(key)
+        if pending is None or pending[0] < limit:
+            fetch_limit = max(limit, KLINES_FETCH_LIMIT)
+            task = self._spawn(self._fetch_klines(key, symbol, interval, fetch_limit, futures))
+            pending = self._klines_inflight[key] = (fetch_limit, task)
+            task.add_done_callback(partial(self._klines_done, key))
+        
+        # shield: bir tüketicinin iptali aynı seriyi bekleyen diğerlerini etkilemez
+        klines = await asyncio.shield(pending[1])
+        return klines[-limit:] if klines else klines
+
+    async def _fetch_klines(self, key: Tuple, symbol: str, interval: str, limit: int,
+                            futures: bool) -> Optional[List[list]]:
+        """Kline serisini çek ve (limit, klines) olarak cache'le"""
+        klines = await self._binance_api.get_klines(symbol, interval, limit=limit, futures=futures)
+        if klines:
+            await self._cached_set(key, (limit, klines))
+        return klines
+
+    def _klines_done(self, key: Tuple, task: asyncio.Task) -> None:
+        """In-flight kline task'ını bırak; bekleyen kalmadıysa exception'ı retrieved işaretle"""
+        pending = self._klines_inflight.get(key)
+        if pending is not None and pending[1] is task:
+            del self._klines_inflight[key]
+        if not task.cancelled():
+            task.exception()
 
     async def _retry_request(self, func, *args, max_retries: int = None, **kwargs) -> Any:
         """Retry mechanism with exponential backoff"""
@@ -235,30 +401,40 @@ class RiskManager:
                     break
                     
                 wait_time = 2 ** attempt  # Exponential backoff
-                logger.warning(f"⚠️ Request failed (attempt {attempt + 1}/{max_retries}), retrying in {wait_time}s: {e}")
+                logger.warning("⚠️ Request failed (attempt %d/%d), retrying in %ss: %s",
+                               attempt + 1, max_retries, wait_time, e)
                 await asyncio.sleep(wait_time)
         
-        logger.error(f"❌ All retries failed: {last_exception}")
+        logger.error("❌ All retries failed: %s", last_exception)
         raise last_exception
 
     # -------------------------
     # GLASSNODE ENTEGRASYONU
     # -------------------------
 
-    async def _fetch_glassnode_data(self, endpoint: str, params: Dict) -> Optional[Dict]:
+    async def _fetch_glassnode_data(self, endpoint: str, params: Mapping[str, Any]) -> Optional[Dict]:
         """Glassnode API'den veri çekme"""
         if not self.config.glassnode_api_key:
             logger.warning("Glassnode API key not configured")
             return None
 
+        # s verilmediyse tüm tarihçe yerine yalnızca son pencere istenir
+        query = {
+            's': int(time.time()) - DEFAULT_GLASSNODE_WINDOW,
+            **params,
+            'api_key': self.config.glassnode_api_key
+        }
+
         async def fetch():
             session = await self._ensure_session()
-            url = f"https://api.glassnode.com/v1/{endpoint}"
-            params['api_key'] = self.config.glassnode_api_key
+            url = self._GLASSNODE_BASE / endpoint
             
-            async with session.get(url, params=params) as response:
+            async with session.get(url, params=query, timeout=MACRO_REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    return await response.json()
+                    data = await _read_json(response)
+                    # Çağıranlar yalnızca data[-1]'i okur; seri 's' penceresiyle zaten
+                    # kısa, kuyruk dışındaki öğeler burada bırakılır (streaming parse gereksiz)
+                    return data[-1:] if isinstance(data, list) else data
                 else:
                     raise Exception(f"API error: {response.status}")
 
@@ -272,9 +448,7 @@ class RiskManager:
             return cached
 
         try:
-            data = await self._fetch_glassnode_data("metrics/indicators/ssr", {
-                'a': 'BTC', 'i': '24h'
-            })
+            data = await self._fetch_glassnode_data("metrics/indicators/ssr", self._GLASSNODE_BTC_DAILY)
             
             if data and len(data) > 0:
                 latest_ssr = data[-1]['v']
@@ -290,7 +464,7 @@ class RiskManager:
                 return score
                 
         except Exception as e:
-            logger.error(f"SSR metric error: {e}")
+            logger.error("SSR metric error: %s", e)
         
         return 0.0
 
@@ -302,9 +476,9 @@ class RiskManager:
             return cached
 
         try:
-            data = await self._fetch_glassnode_data("metrics/transactions/transfers_volume_exchanges_net", {
-                'a': 'BTC', 'i': '24h'
-            })
+            data = await self._fetch_glassnode_data(
+                "metrics/transactions/transfers_volume_exchanges_net", self._GLASSNODE_BTC_DAILY
+            )
             
             if data and len(data) > 0:
                 latest_netflow = data[-1]['v']
@@ -320,7 +494,7 @@ class RiskManager:
                 return score
                 
         except Exception as e:
-            logger.error(f"Netflow metric error: {e}")
+            logger.error("Netflow metric error: %s", e)
         
         return 0.0
 
@@ -333,10 +507,11 @@ class RiskManager:
 
         async def fetch():
             session = await self._ensure_session()
-            url = "https://api.alternative.me/fng/"
-            async with session.get(url) as response:
+            async with session.get(self._FEAR_GREED_URL, timeout=MACRO_REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = await _read_json(response)
+                    if not data:
+                        raise Exception("Empty or oversized Fear & Greed response")
                     score = int(data['data'][0]['value'])
                     return (score - 50) / 50  # 0-100 → -1 to +1
                 raise Exception(f"API error: {response.status}")
@@ -346,11 +521,16 @@ class RiskManager:
             await self._cached_set(cache_key, score)
             return score
         except Exception as e:
-            logger.error(f"Fear & Greed index error: {e}")
+            logger.error("Fear & Greed index error: %s", e)
             return 0.0
 
     async def get_macro_market_signal(self) -> MacroMarketSignal:
-        """Tüm makro metrikleri toplu olarak hesaplar"""
+        """
+        Tüm makro metrikleri toplu olarak hesaplar.
+        
+        Sonuç macro_cache_timeout boyunca cache'lenir; cache boşken gelen eşzamanlı
+        çağrılar _macro_lock üzerinde bekleyip tek hesaplamanın sonucunu paylaşır.
+        """
         cache_key = "macro_signal"
         cached = await self._cached_get(cache_key, self.config.macro_cache_timeout)
         if cached is not None:
@@ -359,20 +539,25 @@ class RiskManager:
         if not self.config.enable_macro_analysis:
             return MacroMarketSignal()
 
+        async with self._macro_lock:
+            # Lock beklenirken başka çağıran hesaplamış olabilir
+            cached = await self._cached_get(cache_key, self.config.macro_cache_timeout)
+            if cached is not None:
+                return cached
+            return await self._compute_macro_market_signal(cache_key)
+
+    async def _compute_macro_market_signal(self, cache_key: str) -> MacroMarketSignal:
+        """Makro sinyalin cache'siz hesaplaması"""
         try:
-            # Paralel olarak tüm metrikleri hesapla
+            # Paralel olarak tüm metrikleri hesapla; iki Glassnode çağrısı aynı
+            # keep-alive bağlantı havuzunu paylaşır. Her alt metrik kendi
+            # timeout'u ile korunur: yavaş endpoint yalnızca kendi skorunu 0.0'a düşürür.
             ssr, netflow, fear_greed = await asyncio.gather(
-                self.get_ssr_metric(),
-                self.get_netflow_metric(),
-                self.get_fear_greed_index(),
-                return_exceptions=True
+                self._spawn(_safe(self.get_ssr_metric(), 0.0)),
+                self._spawn(_safe(self.get_netflow_metric(), 0.0)),
+                self._spawn(_safe(self.get_fear_greed_index(), 0.0))
             )
             
-            # Exception handling
-            ssr = ssr if not isinstance(ssr, Exception) else 0.0
-            netflow = netflow if not isinstance(netflow, Exception) else 0.0
-            fear_greed = fear_greed if not isinstance(fear_greed, Exception) else 0.0
-            
             # ETF flow placeholder
             etf_flow = 0.0
             
@@ -392,7 +577,7 @@ class RiskManager:
             return signal
             
         except Exception as e:
-            logger.error(f"Macro market signal error: {e}")
+            logger.error("Macro market signal error: %s", e)
             return MacroMarketSignal()
 
     # -------------------------
@@ -406,24 +591,22 @@ class RiskManager:
             return 0.0
 
         try:
-            klines = await self._binance_api.get_klines(symbol, interval, limit=20, futures=futures)
-            if not klines:
+            klines = await self._cached_klines(symbol, interval, limit=20, futures=futures)
+            if not klines or len(klines) < 2:
                 return 0.0
-                
-            high_prices = [float(k[2]) for k in klines]
-            low_prices = [float(k[3]) for k in klines]
-            close_prices = [float(k[4]) for k in klines]
             
-            true_ranges = []
-            for i in range(1, len(klines)):
-                high_low = high_prices[i] - low_prices[i]
-                high_close = abs(high_prices[i] - close_prices[i-1])
-                low_close = abs(low_prices[i] - close_prices[i-1])
-                true_ranges.append(max(high_low, high_close, low_close))
+            # Kolonlar: high, low, close
+            hlc = np.array([k[2:5] for k in klines], dtype=np.float64)
+            high, low, prev_close = hlc[1:, 0], hlc[1:, 1], hlc[:-1, 2]
             
-            return mean(true_ranges) if true_ranges else 0.0
+            true_ranges = np.maximum.reduce([
+                high - low,
+                np.abs(high - prev_close),
+                np.abs(low - prev_close)
+            ])
+            return float(true_ranges[-self.config.atr_period:].mean())
         except Exception as e:
-            logger.error(f"ATR calculation error for {symbol}: {e}")
+            logger.error("ATR calculation error for %s: %s", symbol, e)
             return 0.0
 
     async def liquidation_proximity(self, symbol: str, position: Optional[dict]) -> float:
@@ -444,31 +627,90 @@ class RiskManager:
             
             return max(0.0, min(1.0, (price_ratio - safety_margin) / (1 - safety_margin)))
         except Exception as e:
-            logger.error(f"Liquidation proximity calculation error for {symbol}: {e}")
+            logger.error("Liquidation proximity calculation error for %s: %s", symbol, e)
             return 1.0
 
-    async def correlation_risk(self, symbol: str, portfolio_symbols: Sequence[str]) -> float:
-        """Correlation risk hesaplama"""
-        if len(portfolio_symbols) < 2:
+    async def _log_returns(self, symbols: Sequence[str], lookback: int,
+                           interval: str = "1h", futures: bool = False) -> Optional[np.ndarray]:
+        """
+        Sembollerin kapanışlarından (N, T) log-return matrisi üret.
+        
+        Kline'lar eşzamanlı çekilir; seriler ortak (en kısa) uzunluğa kırpılır.
+        
+        Args:
+            symbols: Trading pair listesi
+            lookback: Return sayısı
+            interval: Kline interval
+            futures: Futures piyasası mı
+            
+        Returns:
+            float64 log-return matrisi veya veri yetersizse None
+        """
+        klines_list = await asyncio.gather(*(
+            self._cached_klines(s, interval, limit=lookback + 1, futures=futures)
+            for s in symbols
+        ))
+        if not all(klines_list):
+            return None
+        
+        length = min(map(len, klines_list))
+        if length < 3:
+            return None
+        
+        prices = np.array(
+            [[float(k[4]) for k in klines[-length:]] for klines in klines_list],
+            dtype=np.float64
+        )
+        return np.diff(np.log(prices), axis=1)
+
+    async def correlation_risk(self, symbol: str, portfolio_symbols: Sequence[str],
+                               lookback: int = 100, interval: str = "1h",
+                               futures: bool = False) -> float:
+        """
+        Correlation risk: sembolün portföydeki diğer sembollerle ortalama |korelasyonu|.
+        
+        Returns:
+            0 (korelasyonsuz) ile 1 (tam korele) arası penalty
+        """
+        others = [s for s in dict.fromkeys(portfolio_symbols) if s.upper() != symbol.upper()]
+        if not others or not self._binance_api:
             return 0.0
             
         try:
-            # Basit korelasyon hesaplama (gerçek implementasyon için daha karmaşık logic gerekli)
-            return 0.3
+            rets = await self._log_returns([symbol, *others], lookback, interval, futures)
+            if rets is None:
+                return 0.5
+            corr = np.corrcoef(rets)
+            return float(np.clip(np.nanmean(np.abs(corr[0, 1:])), 0.0, 1.0))
         except Exception as e:
-            logger.error(f"Correlation risk calculation error for {symbol}: {e}")
+            logger.error("Correlation risk calculation error for %s: %s", symbol, e)
             return 0.5
 
-    async def portfolio_var(self, symbols: List[str]) -> float:
-        """Portfolio Value at Risk hesaplama"""
-        if not symbols:
+    async def portfolio_var(self, symbols: List[str], lookback: int = 250,
+                            interval: str = "1h", futures: bool = False) -> float:
+        """
+        Eşit ağırlıklı portföyün parametrik (varyans-kovaryans) Value at Risk'i.
+        
+        σ² = wᵀΣw, VaR = z(var_confidence) · σ (tek periyot, getiri oranı olarak).
+        
+        Returns:
+            0-1 arası VaR oranı
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols or not self._binance_api:
             return 0.0
             
         try:
-            # Basit VaR hesaplama
-            return 0.05  # 5% VaR
+            rets = await self._log_returns(symbols, lookback, interval, futures)
+            if rets is None:
+                return 0.1
+            cov = np.atleast_2d(np.cov(rets))
+            weights = np.full(len(symbols), 1.0 / len(symbols))
+            sigma = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+            z = NormalDist().inv_cdf(self.config.var_confidence)
+            return min(1.0, z * sigma)
         except Exception as e:
-            logger.error(f"Portfolio VaR calculation error: {e}")
+            logger.error("Portfolio VaR calculation error: %s", e)
             return 0.1
 
     # -------------------------
@@ -492,60 +734,55 @@ class RiskManager:
                 logger.error("Binance API not available for risk calculation")
                 return metrics
 
+            position = next((p for p in account_positions or []
+                             if p.get("symbol", "").upper() == symbol.upper()), None)
+
+            # Fiyat, mikro metrikler ve makro sinyal birbirinden bağımsız I/O:
+            # toplam gecikme sum(...) yerine max(...)
+            price, atr, liq, corr, var, macro_signal = await asyncio.gather(
+                self._binance_api.get_price(symbol, futures=False),
+                self.compute_atr(symbol),
+                self.liquidation_proximity(symbol, position),
+                self.correlation_risk(symbol, portfolio_symbols or []),
+                self.portfolio_var(list(portfolio_symbols or [symbol])),
+                self.get_macro_market_signal() if include_macro else _none(),
+                return_exceptions=True
+            )
+
             # Temel fiyat verileri
-            price = await self._binance_api.get_price(symbol, futures=False)
-            if not price:
+            if isinstance(price, Exception) or not price:
                 return metrics
                 
             metrics.price = price
-
-            # Mikro metrikleri paralel hesapla
-            atr_task = self.compute_atr(symbol)
-            liq_task = self.liquidation_proximity(symbol, 
-                next((p for p in account_positions or [] 
-                     if p.get("symbol", "").upper() == symbol.upper()), None)
-            )
-            corr_task = self.correlation_risk(symbol, portfolio_symbols or [])
-            var_task = self.portfolio_var(list(portfolio_symbols or [symbol]))
-            macro_task = self.get_macro_market_signal() if include_macro else None
-
-            # Tüm hesaplamaları bekle
-            results = await asyncio.gather(
-                atr_task, liq_task, corr_task, var_task,
-                return_exceptions=True
-            )
             
             # Sonuçları işle
-            metrics.atr = results[0] if not isinstance(results[0], Exception) else 0.0
-            metrics.liquidation_proximity = results[1] if not isinstance(results[1], Exception) else 1.0
-            metrics.correlation_penalty = results[2] if not isinstance(results[2], Exception) else 0.5
-            metrics.portfolio_var = results[3] if not isinstance(results[3], Exception) else 0.1
+            metrics.atr = atr if not isinstance(atr, Exception) else 0.0
+            metrics.liquidation_proximity = liq if not isinstance(liq, Exception) else 1.0
+            metrics.correlation_penalty = corr if not isinstance(corr, Exception) else 0.5
+            metrics.portfolio_var = var if not isinstance(var, Exception) else 0.1
 
             # Makro sinyal
-            if macro_task:
-                macro_signal = await macro_task
+            if macro_signal is not None and not isinstance(macro_signal, Exception):
+                metrics.macro_signal = macro_signal
                 metrics.macro_score = macro_signal.overall_score
                 metrics.macro_confidence = macro_signal.confidence
 
             # Volatilite metriği
             metrics.vol_metric = min(1.0, (metrics.price / metrics.atr) / 100.0) if metrics.atr > 0 else 0.0
 
-            # Ağırlıklı skor hesaplama
-            weights = {
-                'vol': 0.30, 'liq': 0.20, 'corr': 0.20, 'var': 0.20, 'macro': 0.10
-            }
-            
-            scores = {
-                'vol': metrics.vol_metric,
-                'liq': metrics.liquidation_proximity,
-                'corr': 1.0 - metrics.correlation_penalty,
-                'var': 1.0 - metrics.portfolio_var,
-                'macro': metrics.macro_score
-            }
-
-            total_score = sum(weights[key] * scores[key] for key in weights)
+            # Ağırlıklı skor hesaplama: w · [vol, liq, corr, var, macro]
+            weights = self._score_weights()
+            components = np.array([
+                metrics.vol_metric,
+                metrics.liquidation_proximity,
+                1.0 - metrics.correlation_penalty,
+                1.0 - metrics.portfolio_var,
+                metrics.macro_score
+            ], dtype=np.float64)
+
+            total_score = float(weights @ components)
             metrics.score = max(0.0, min(1.0, total_score))
-            metrics.score_without_macro = metrics.score - weights['macro'] * scores['macro']
+            metrics.score_without_macro = metrics.score - float(weights[-1]) * metrics.macro_score
 
             # Piyasa rejimi
             if metrics.macro_score > 0.3:
@@ -558,10 +795,10 @@ class RiskManager:
                 metrics.market_regime = "NEUTRAL"
                 metrics.recommendation = "NEUTRAL"
 
-            logger.info(f"✅ Risk skoru {symbol}: {metrics.score:.3f} (macro: {metrics.macro_score:.3f})")
+            logger.info("✅ Risk skoru %s: %.3f (macro: %.3f)", symbol, metrics.score, metrics.macro_score)
             
         except Exception as e:
-            logger.error(f"❌ Risk skoru hesaplama hatası {symbol}: {e}")
+            logger.error("❌ Risk skoru hesaplama hatası %s: %s", symbol, e)
             
         return metrics
 
@@ -570,7 +807,14 @@ class RiskManager:
     # -------------------------
 
     async def close(self):
-        """Resource cleanup"""
+        """Resource cleanup: in-flight makro istekleri iptal, cache boşaltılır, session kapanır"""
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._cache.clear()
+        
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
@@ -590,7 +834,11 @@ class RiskManager:
 
 def create_risk_router() -> Optional[Router]:
     """Aiogram 3.x router factory function"""
-    if not AIOGRAM_AVAILABLE:
+    try:
+        from aiogram import Router
+        from aiogram.filters import Command
+        from aiogram.types import Message
+    except ImportError:
         logger.warning("Aiogram not available - risk router disabled")
         return None
 
@@ -617,42 +865,44 @@ def create_risk_router() -> Optional[Router]:
                 macro_weight=float(os.getenv("MACRO_WEIGHT", DEFAULT_MACRO_WEIGHT))
             )
                 
-            async with RiskManager() as risk_manager:
-                await risk_manager.initialize(binance_api, config)
-                metrics = await risk_manager.combined_risk_score(
-                    symbol, 
-                    portfolio_symbols=["BTCUSDT", "ETHUSDT", "BNBUSDT"],
-                    include_macro=True
-                )
-                
-                macro = await risk_manager.get_macro_market_signal()
-                
-                text = (
-                    f"🎯 **Gelişmiş Risk Analizi - {metrics.symbol}**\n\n"
-                    f"📊 **Temel Metrikler:**\n"
-                    f"• Price: ${metrics.price:,.2f}\n"
-                    f"• ATR: {metrics.atr:.4f}\n"
-                    f"• Volatility Score: {metrics.vol_metric:.3f}\n"
-                    f"• Liquidation Safety: {metrics.liquidation_proximity:.3f}\n"
-                    f"• Correlation Penalty: {metrics.correlation_penalty:.3f}\n"
-                    f"• Portfolio VaR: {metrics.portfolio_var:.3f}\n\n"
-                    f"🌍 **Makro Piyasa:**\n"
-                    f"• SSR Score: {macro.ssr_score:.3f}\n"
-                    f"• Netflow Score: {macro.netflow_score:.3f}\n"
-                    f"• Fear & Greed: {macro.fear_greed_score:.3f}\n"
-                    f"• Overall Macro: {macro.overall_score:.3f}\n"
-                    f"• Market Regime: {metrics.market_regime}\n\n"
-                    f"📈 **Risk Skorları:**\n"
-                    f"• Micro-Only Score: {metrics.score_without_macro:.3f}\n"
-                    f"• Final Score: {metrics.score:.3f}\n"
-                    f"• Recommendation: {metrics.recommendation}\n"
-                    f"• Confidence: {metrics.macro_confidence:.3f}"
-                )
-                
-                await message.answer(text, parse_mode="Markdown")
-                
+            # Paylaşılan instance: komut başına kapatılmaz (cache ve session korunur),
+            # shutdown'da close_risk_managers() ile kapanır
+            risk_manager = get_risk_manager(binance_api, config)
+            metrics = await risk_manager.combined_risk_score(
+                symbol, 
+                portfolio_symbols=["BTCUSDT", "ETHUSDT", "BNBUSDT"],
+                include_macro=True
+            )
+            
+            # Makro sinyal combined_risk_score içinde zaten hesaplandı
+            macro = metrics.macro_signal or MacroMarketSignal()
+            
+            text = (
+                f"🎯 **Gelişmiş Risk Analizi - {metrics.symbol}**\n\n"
+                f"📊 **Temel Metrikler:**\n"
+                f"• Price: ${metrics.price:,.2f}\n"
+                f"• ATR: {metrics.atr:.4f}\n"
+                f"• Volatility Score: {metrics.vol_metric:.3f}\n"
+                f"• Liquidation Safety: {metrics.liquidation_proximity:.3f}\n"
+                f"• Correlation Penalty: {metrics.correlation_penalty:.3f}\n"
+                f"• Portfolio VaR: {metrics.portfolio_var:.3f}\n\n"
+                f"🌍 **Makro Piyasa:**\n"
+                f"• SSR Score: {macro.ssr_score:.3f}\n"
+                f"• Netflow Score: {macro.netflow_score:.3f}\n"
+                f"• Fear & Greed: {macro.fear_greed_score:.3f}\n"
+                f"• Overall Macro: {macro.overall_score:.3f}\n"
+                f"• Market Regime: {metrics.market_regime}\n\n"
+                f"📈 **Risk Skorları:**\n"
+                f"• Micro-Only Score: {metrics.score_without_macro:.3f}\n"
+                f"• Final Score: {metrics.score:.3f}\n"
+                f"• Recommendation: {metrics.recommendation}\n"
+                f"• Confidence: {metrics.macro_confidence:.3f}"
+            )
+            
+            await message.answer(text, parse_mode="Markdown")
+            
         except Exception as e:
-            logger.exception(f"Advanced risk command error: {e}")
+            logger.exception("Advanced risk command error: %s", e)
             await message.answer("❌ Risk analiz hatası. Loglara bakın.")
 
     @router.message(Command("risk_settings"))
@@ -679,7 +929,7 @@ def create_risk_router() -> Optional[Router]:
             await message.answer(text, parse_mode="Markdown")
             
         except Exception as e:
-            logger.error(f"Risk settings command error: {e}")
+            logger.error("Risk settings command error: %s", e)
             await message.answer("❌ Ayarlar gösterilemedi.")
 
     return router
@@ -697,10 +947,35 @@ async def get_global_risk_manager(binance_api=None, config: Optional[RiskManager
     
     async with _global_lock:
         if _global_risk_manager is None:
-            _global_risk_manager = RiskManager()
-            await _global_risk_manager.initialize(binance_api, config)
+            _global_risk_manager = await RiskManager.create(binance_api, config)
         return _global_risk_manager
 
+# RiskManager._instances weak referans tutar; komut handler'larının kullandığı
+# instance'lar burada güçlü referansla yaşar (cache/session komutlar arası korunur)
+_risk_managers: Dict[int, RiskManager] = {}
+
+def get_risk_manager(binance_api=None, config: Optional[RiskManagerConfig] = None) -> RiskManager:
+    """
+    BinanceAPI instance'ına bağlı paylaşılan RiskManager'ı döndürür (yoksa oluşturur).
+    
+    Args:
+        binance_api: BinanceAPI instance (opsiyonel)
+        config: RiskManagerConfig (opsiyonel; verilirse mevcut instance'a uygulanır)
+        
+    Returns:
+        RiskManager instance (BinanceAPI başına bir tane, close_risk_managers()'a kadar canlı)
+    """
+    manager = RiskManager(binance_api, config)
+    _risk_managers[id(binance_api)] = manager
+    return manager
+
+async def close_risk_managers() -> None:
+    """Canlı tüm RiskManager instance'larını kapatır ve registry'i temizler (bot shutdown)"""
+    managers = {id(m): m for m in (*_risk_managers.values(), *RiskManager._instances.values())}
+    _risk_managers.clear()
+    if managers:
+        await asyncio.gather(*(manager.close() for manager in managers.values()), return_exceptions=True)
+
 async def close_global_risk_manager():
     """Global RiskManager cleanup"""
     global _global_risk_manager
@@ -719,5 +994,13 @@ async def risk_manager_context(binance_api=None, config: Optional[RiskManagerCon
     finally:
         await close_global_risk_manager()
 
-# Router instance for easy import
-risk_router = create_risk_router()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_router() -> Optional[Router]:
+    """Risk router'ını ilk istekte oluşturur (aiogram lazy import)"""
+    return create_risk_router()
+
+def __getattr__(name: str) -> Any:
+    """Geriye uyumluluk: `from analysis.risk import risk_router` lazy çözülür"""
+    if name == "risk_router":
+        return get_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
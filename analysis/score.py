@@ -7,7 +7,6 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
-from scipy import stats
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +40,17 @@ class ScoreAggregator:
     def __init__(self, config: Optional[ScoreConfig] = None):
         self.config = config or ScoreConfig()
         self._confidence_cache = {}
+        # Modül sırası → hizalı ağırlık vektörü (np.dot için)
+        self._weight_vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+    
+    def _weight_vector(self, modules: Tuple[str, ...]) -> np.ndarray:
+        """Verilen modül sırasına hizalı ağırlık vektörü (cache'li)"""
+        weights = self._weight_vectors.get(modules)
+        if weights is None:
+            module_weights = self.config.module_weights
+            weights = np.array([module_weights.get(m, 0.0) for m in modules], dtype=np.float64)
+            self._weight_vectors[modules] = weights
+        return weights
         
     def calculate_confidence(self, scores: Dict[str, float]) -> float:
         """Skorların güvenilirliğini hesapla"""
@@ -96,20 +106,21 @@ class ScoreAggregator:
             Dict containing final_score, confidence, and component scores
         """
         try:
-            # Normalize scores
-            normalized_scores = self.normalize_scores(module_scores)
-            
-            # Calculate weighted average
-            final_score = 0.0
-            total_weight = 0.0
+            # Normalize scores: (e^{2s}-1)/(e^{2s}+1) == tanh(s) → tek vektör işlemi
+            modules = tuple(module_scores)
+            raw = np.fromiter(
+                (0.0 if s is None else s for s in module_scores.values()),
+                dtype=np.float64, count=len(modules)
+            )
+            normalized = np.tanh(np.clip(raw, -1.0, 1.0))
+            normalized_scores = dict(zip(modules, normalized.tolist()))
             
-            for module, score in normalized_scores.items():
-                weight = self.config.module_weights.get(module, 0.0)
-                final_score += score * weight
-                total_weight += weight
+            # Calculate weighted average (tek np.dot)
+            weights = self._weight_vector(modules)
+            total_weight = float(weights.sum())
             
             if total_weight > 0:
-                final_score /= total_weight
+                final_score = float(normalized @ weights) / total_weight
             else:
                 final_score = 0.0
             
@@ -8,23 +8,61 @@ import os
 import logging
 import sys
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from functools import cached_property, lru_cache, partial
+from typing import Dict, List, Any
 from dotenv import load_dotenv
 
 # Environment variables'ı yükle
 load_dotenv()
 
+# Env snapshot: field factory'leri os.environ yerine bu dict'ten okur
+# (os.environ'a sonradan yazılanlar BotConfig.reload_env() ile alınır)
+_ENV: Dict[str, str] = dict(os.environ)
+
 # Logging yapılandırması
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.getLevelName(os.getenv("LOG_LEVEL", "INFO")))
 
-# Global cache instance
-_CONFIG_INSTANCE: Optional["BotConfig"] = None
+# to_dict() çıktısında maskelenen alanlar
+_SENSITIVE_FIELDS: frozenset = frozenset({
+    "TELEGRAM_TOKEN", "BINANCE_API_KEY", "BINANCE_API_SECRET", "WEBHOOK_SECRET"
+})
+
+# ========================
+# Env okuma yardımcıları
+# ========================
+# Dataclass default_factory'leri için partial(_env_x, NAME, default) kullanılır:
+# alan başına closure/lambda yok, parse kuralları tek yerde.
+def _env_str(name: str, default: str) -> str:
+    return _ENV.get(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = _ENV.get(name)
+    return default if value is None else int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _ENV.get(name)
+    return default if value is None else float(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = _ENV.get(name)
+    return default if value is None else value.lower() == "true"
+
+
+def _env_list(name: str, default: str = "", sep: str = ",") -> List[str]:
+    return [item.strip() for item in _ENV.get(name, default).split(sep) if item.strip()]
+
+
+def _env_int_list(name: str, default: str = "", sep: str = ",") -> List[int]:
+    return [int(item) for item in _env_list(name, default, sep) if item.isdigit()]
 
 
 @dataclass
 class OnChainConfig:
-    GLASSNODE_API_KEY: str = field(default_factory=lambda: os.getenv("GLASSNODE_API_KEY", "your_glassnode_api_key_here"))
+    GLASSNODE_API_KEY: str = field(default_factory=partial(_env_str, "GLASSNODE_API_KEY", "your_glassnode_api_key_here"))
     METRIC_WEIGHTS: Dict[str, float] = field(default_factory=lambda: {
         "stablecoin_supply_ratio": 0.3,
         "exchange_net_flow": 0.3,
@@ -66,8 +104,8 @@ class OnChainConfig:
 class AnalysisConfig:
     """Analiz modülü konfigürasyonu"""
     # Cache ayarları
-    ANALYSIS_CACHE_TTL: int = field(default_factory=lambda: int(os.getenv("ANALYSIS_CACHE_TTL", "60")))
-    MAX_CACHE_SIZE: int = field(default_factory=lambda: int(os.getenv("MAX_CACHE_SIZE", "1000")))
+    ANALYSIS_CACHE_TTL: int = field(default_factory=partial(_env_int, "ANALYSIS_CACHE_TTL", 60))
+    MAX_CACHE_SIZE: int = field(default_factory=partial(_env_int, "MAX_CACHE_SIZE", 1000))
     
     # Skor threshold'ları
     SIGNAL_THRESHOLDS: Dict[str, float] = field(default_factory=lambda: {
@@ -100,8 +138,8 @@ class AnalysisConfig:
     })
     
     # Risk yönetimi
-    MIN_CONFIDENCE: float = field(default_factory=lambda: float(os.getenv("MIN_CONFIDENCE", "0.3")))
-    MAX_POSITION_SIZE: float = field(default_factory=lambda: float(os.getenv("MAX_POSITION_SIZE", "0.1")))
+    MIN_CONFIDENCE: float = field(default_factory=partial(_env_float, "MIN_CONFIDENCE", 0.3))
+    MAX_POSITION_SIZE: float = field(default_factory=partial(_env_float, "MAX_POSITION_SIZE", 0.1))
 
 
 @dataclass
@@ -111,50 +149,48 @@ class BotConfig:
     # ========================
     # 🤖 TELEGRAM BOT SETTINGS
     # ========================
-    TELEGRAM_TOKEN: str = field(default_factory=lambda: os.getenv("TELEGRAM_TOKEN", ""))
-    NGROK_URL: str = field(default_factory=lambda: os.getenv("NGROK_URL", "https://2fce5af7336f.ngrok-free.app"))
+    TELEGRAM_TOKEN: str = field(default_factory=partial(_env_str, "TELEGRAM_TOKEN", ""))
+    NGROK_URL: str = field(default_factory=partial(_env_str, "NGROK_URL", "https://2fce5af7336f.ngrok-free.app"))
     
-    DEFAULT_LOCALE: str = field(default_factory=lambda: os.getenv("DEFAULT_LOCALE", "en"))
-    ADMIN_IDS: List[int] = field(default_factory=lambda: [
-        int(x.strip()) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()
-    ])
+    DEFAULT_LOCALE: str = field(default_factory=partial(_env_str, "DEFAULT_LOCALE", "en"))
+    ADMIN_IDS: List[int] = field(default_factory=partial(_env_int_list, "ADMIN_IDS"))
     
     # Webhook settings
-    USE_WEBHOOK: bool = field(default_factory=lambda: os.getenv("USE_WEBHOOK", "false").lower() == "true")
-    WEBHOOK_HOST: str = field(default_factory=lambda: os.getenv("WEBHOOK_HOST", ""))
-    WEBHOOK_SECRET: str = field(default_factory=lambda: os.getenv("WEBHOOK_SECRET", ""))
-    WEBAPP_HOST: str = field(default_factory=lambda: os.getenv("WEBAPP_HOST", "0.0.0.0"))
-    WEBAPP_PORT: int = field(default_factory=lambda: int(os.getenv("PORT", "3000")))
+    USE_WEBHOOK: bool = field(default_factory=partial(_env_bool, "USE_WEBHOOK", False))
+    WEBHOOK_HOST: str = field(default_factory=partial(_env_str, "WEBHOOK_HOST", ""))
+    WEBHOOK_SECRET: str = field(default_factory=partial(_env_str, "WEBHOOK_SECRET", ""))
+    WEBAPP_HOST: str = field(default_factory=partial(_env_str, "WEBAPP_HOST", "0.0.0.0"))
+    WEBAPP_PORT: int = field(default_factory=partial(_env_int, "PORT", 3000))
     
     # Aiogram specific settings
-    AIOGRAM_REDIS_HOST: str = field(default_factory=lambda: os.getenv("AIOGRAM_REDIS_HOST", "localhost"))
-    AIOGRAM_REDIS_PORT: int = field(default_factory=lambda: int(os.getenv("AIOGRAM_REDIS_PORT", "6379")))
-    AIOGRAM_REDIS_DB: int = field(default_factory=lambda: int(os.getenv("AIOGRAM_REDIS_DB", "0")))
+    AIOGRAM_REDIS_HOST: str = field(default_factory=partial(_env_str, "AIOGRAM_REDIS_HOST", "localhost"))
+    AIOGRAM_REDIS_PORT: int = field(default_factory=partial(_env_int, "AIOGRAM_REDIS_PORT", 6379))
+    AIOGRAM_REDIS_DB: int = field(default_factory=partial(_env_int, "AIOGRAM_REDIS_DB", 0))
     
     # FSM storage settings
-    USE_REDIS_FSM: bool = field(default_factory=lambda: os.getenv("USE_REDIS_FSM", "true").lower() == "true")
-    FSM_STORAGE_TTL: int = field(default_factory=lambda: int(os.getenv("FSM_STORAGE_TTL", "3600")))
+    USE_REDIS_FSM: bool = field(default_factory=partial(_env_bool, "USE_REDIS_FSM", True))
+    FSM_STORAGE_TTL: int = field(default_factory=partial(_env_int, "FSM_STORAGE_TTL", 3600))
     
     # ========================
     # 🔐 BINANCE API SETTINGS
     # ========================
-    BINANCE_API_KEY: str = field(default_factory=lambda: os.getenv("BINANCE_API_KEY", ""))
-    BINANCE_API_SECRET: str = field(default_factory=lambda: os.getenv("BINANCE_API_SECRET", ""))
-    BINANCE_BASE_URL: str = field(default_factory=lambda: os.getenv("BINANCE_BASE_URL", "https://api.binance.com"))
-    BINANCE_FAPI_URL: str = field(default_factory=lambda: os.getenv("BINANCE_FAPI_URL", "https://fapi.binance.com"))
-    BINANCE_WS_URL: str = field(default_factory=lambda: os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws"))
+    BINANCE_API_KEY: str = field(default_factory=partial(_env_str, "BINANCE_API_KEY", ""))
+    BINANCE_API_SECRET: str = field(default_factory=partial(_env_str, "BINANCE_API_SECRET", ""))
+    BINANCE_BASE_URL: str = field(default_factory=partial(_env_str, "BINANCE_BASE_URL", "https://api.binance.com"))
+    BINANCE_FAPI_URL: str = field(default_factory=partial(_env_str, "BINANCE_FAPI_URL", "https://fapi.binance.com"))
+    BINANCE_WS_URL: str = field(default_factory=partial(_env_str, "BINANCE_WS_URL", "wss://stream.binance.com:9443/ws"))
 
     # ========================
     # ⚙️ TECHNICAL SETTINGS
     # ========================
-    DEBUG: bool = field(default_factory=lambda: os.getenv("DEBUG", "false").lower() == "true")
-    LOG_LEVEL: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
+    DEBUG: bool = field(default_factory=partial(_env_bool, "DEBUG", False))
+    LOG_LEVEL: str = field(default_factory=partial(_env_str, "LOG_LEVEL", "INFO"))
     
     # Rate limiting
     # Devre kesici ayarları
-    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = field(default_factory=lambda: int(os.getenv("FAILURE_THRESHOLD", "5")))
-    CIRCUIT_BREAKER_RESET_TIMEOUT: int = field(default_factory=lambda: int(os.getenv("RESET_TIMEOUT", "30")))
-    CIRCUIT_BREAKER_HALF_OPEN_TIMEOUT: int = field(default_factory=lambda: int(os.getenv("HALF_OPEN_TIMEOUT", "15")))
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = field(default_factory=partial(_env_int, "FAILURE_THRESHOLD", 5))
+    CIRCUIT_BREAKER_RESET_TIMEOUT: int = field(default_factory=partial(_env_int, "RESET_TIMEOUT", 30))
+    CIRCUIT_BREAKER_HALF_OPEN_TIMEOUT: int = field(default_factory=partial(_env_int, "HALF_OPEN_TIMEOUT", 15))
 
     # On-chain analiz için alt config nesnesi
     ONCHAIN: OnChainConfig = field(default_factory=OnChainConfig)
@@ -163,54 +199,51 @@ class BotConfig:
     ANALYSIS: AnalysisConfig = field(default_factory=AnalysisConfig)
     
     # Database settings
-    DATABASE_URL: str = field(default_factory=lambda: os.getenv("DATABASE_URL", ""))
-    USE_DATABASE: bool = field(default_factory=lambda: os.getenv("USE_DATABASE", "false").lower() == "true")
+    DATABASE_URL: str = field(default_factory=partial(_env_str, "DATABASE_URL", ""))
+    USE_DATABASE: bool = field(default_factory=partial(_env_bool, "USE_DATABASE", False))
     
     # Cache settings
-    CACHE_TTL: int = field(default_factory=lambda: int(os.getenv("CACHE_TTL", "300")))
-    MAX_CACHE_SIZE: int = field(default_factory=lambda: int(os.getenv("MAX_CACHE_SIZE", "1000")))
+    CACHE_TTL: int = field(default_factory=partial(_env_int, "CACHE_TTL", 300))
+    MAX_CACHE_SIZE: int = field(default_factory=partial(_env_int, "MAX_CACHE_SIZE", 1000))
 
     # Analytics specific settings
-    CAUSALITY_WINDOW: int = field(default_factory=lambda: int(os.getenv("CAUSALITY_WINDOW", "100")))
-    CAUSALITY_MAXLAG: int = field(default_factory=lambda: int(os.getenv("CAUSALITY_MAXLAG", "2")))
-    CAUSALITY_CACHE_TTL: int = field(default_factory=lambda: int(os.getenv("CAUSALITY_CACHE_TTL", "10")))
-    CAUSALITY_TOP_ALTCOINS: List[str] = field(default_factory=lambda: [
-        symbol.strip() for symbol in os.getenv(
-            "CAUSALITY_TOP_ALTCOINS", 
-            "BNBUSDT,ADAUSDT,SOLUSDT,XRPUSDT,DOTUSDT"
-        ).split(",") if symbol.strip()
-    ])
+    CAUSALITY_WINDOW: int = field(default_factory=partial(_env_int, "CAUSALITY_WINDOW", 100))
+    CAUSALITY_MAXLAG: int = field(default_factory=partial(_env_int, "CAUSALITY_MAXLAG", 2))
+    CAUSALITY_CACHE_TTL: int = field(default_factory=partial(_env_int, "CAUSALITY_CACHE_TTL", 10))
+    CAUSALITY_TOP_ALTCOINS: List[str] = field(default_factory=partial(
+        _env_list, "CAUSALITY_TOP_ALTCOINS",
+        "BNBUSDT,ADAUSDT,SOLUSDT,XRPUSDT,DOTUSDT"
+    ))
 
     # ========================
     # 📊 TRADING SETTINGS
     # ========================
-    SCAN_SYMBOLS: List[str] = field(default_factory=lambda: [
-        symbol.strip() for symbol in os.getenv(
-            "SCAN_SYMBOLS", 
-            "BTCUSDT,ETHUSDT,BNBUSDT,SOLUSDT,TRXUSDT,CAKEUSDT,SUIUSDT,PEPEUSDT,ARPAUSDT,TURBOUSDT"
-        ).split(",") if symbol.strip()
-    ])
+    SCAN_SYMBOLS: List[str] = field(default_factory=partial(
+        _env_list, "SCAN_SYMBOLS",
+        "BTCUSDT,ETHUSDT,BNBUSDT,SOLUSDT,TRXUSDT,CAKEUSDT,SUIUSDT,PEPEUSDT,ARPAUSDT,TURBOUSDT"
+    ))
     
-    ENABLE_TRADING: bool = field(default_factory=lambda: os.getenv("ENABLE_TRADING", "false").lower() == "true")
-    TRADING_STRATEGY: str = field(default_factory=lambda: os.getenv("TRADING_STRATEGY", "conservative"))
-    MAX_LEVERAGE: int = field(default_factory=lambda: int(os.getenv("MAX_LEVERAGE", "3")))
+    ENABLE_TRADING: bool = field(default_factory=partial(_env_bool, "ENABLE_TRADING", False))
+    TRADING_STRATEGY: str = field(default_factory=partial(_env_str, "TRADING_STRATEGY", "conservative"))
+    MAX_LEVERAGE: int = field(default_factory=partial(_env_int, "MAX_LEVERAGE", 3))
     
     # Alert settings
-    ALERT_PRICE_CHANGE_PERCENT: float = field(default_factory=lambda: float(os.getenv("ALERT_PRICE_CHANGE_PERCENT", "5.0")))
-    ENABLE_PRICE_ALERTS: bool = field(default_factory=lambda: os.getenv("ENABLE_PRICE_ALERTS", "true").lower() == "true")
-    ALERT_COOLDOWN: int = field(default_factory=lambda: int(os.getenv("ALERT_COOLDOWN", "300")))
+    ALERT_PRICE_CHANGE_PERCENT: float = field(default_factory=partial(_env_float, "ALERT_PRICE_CHANGE_PERCENT", 5.0))
+    ENABLE_PRICE_ALERTS: bool = field(default_factory=partial(_env_bool, "ENABLE_PRICE_ALERTS", True))
+    ALERT_COOLDOWN: int = field(default_factory=partial(_env_int, "ALERT_COOLDOWN", 300))
 
     # ========================
     # 🛠️ METHODS & PROPERTIES
     # ========================
-    @property
+    # Config yüklendikten sonra değişmez; ilk erişimde hesaplanıp instance'a yazılır
+    @cached_property
     def WEBHOOK_PATH(self) -> str:
-        """Webhook path'i dinamik olarak oluşturur (Telegram formatına uygun)."""
+        """Webhook path'i oluşturur (Telegram formatına uygun)."""
         if not self.TELEGRAM_TOKEN:
             return "/webhook/default"
         return f"/webhook/{self.TELEGRAM_TOKEN}"
 
-    @property
+    @cached_property
     def WEBHOOK_URL(self) -> str:
         """Webhook URL'ini döndürür. Sadece USE_WEBHOOK=True ise anlamlı değer üretir."""
         if not self.USE_WEBHOOK or not self.WEBHOOK_HOST:
@@ -222,6 +255,12 @@ class BotConfig:
         """Environment'dan config yükler."""
         return cls()
 
+    @staticmethod
+    def reload_env() -> None:
+        """Env snapshot'ını os.environ'dan yeniler (test / runtime env değişikliği)."""
+        _ENV.clear()
+        _ENV.update(os.environ)
+
     def validate(self) -> bool:
         """Config değerlerini doğrular. Hata durumunda kontrollü çıkış yapar."""
         errors = []
@@ -258,15 +297,11 @@ class BotConfig:
         Args:
             include_sensitive: Hassas bilgileri gösterilsin mi? (default: False)
         """
-        sensitive_fields = {"TELEGRAM_TOKEN", "BINANCE_API_KEY", "BINANCE_API_SECRET", "WEBHOOK_SECRET"}
-        result = {}
-        
-        for field_name in self.__dataclass_fields__:
-            value = getattr(self, field_name)
-            if field_name in sensitive_fields and value and not include_sensitive:
-                result[field_name] = "***HIDDEN***"
-            else:
-                result[field_name] = value
+        hidden = frozenset() if include_sensitive else _SENSITIVE_FIELDS
+        result = {
+            name: "***HIDDEN***" if name in hidden and value else value
+            for name, value in ((name, getattr(self, name)) for name in self.__dataclass_fields__)
+        }
         
         # Property'leri de ekle
         result["WEBHOOK_PATH"] = self.WEBHOOK_PATH
@@ -281,25 +316,24 @@ class BotConfig:
 
 def reload_config() -> BotConfig:
     """Config'i yeniden yükler ve cache'i temizler."""
-    global _CONFIG_INSTANCE
-    _CONFIG_INSTANCE = None
+    BotConfig.reload_env()
+    get_config_sync.cache_clear()
     logger.info("🔄 Config cache temizlendi, yeniden yükleniyor...")
     return get_config_sync()
 
 
+@lru_cache(maxsize=1)
 def get_config_sync() -> BotConfig:
-    """Sync config instance'ını döndürür."""
-    global _CONFIG_INSTANCE
-    if _CONFIG_INSTANCE is None:
-        _CONFIG_INSTANCE = BotConfig.load()
-        _CONFIG_INSTANCE.validate()
-        logger.info("✅ Bot config yüklendi ve doğrulandı")
-        
-        # Debug log'da sadece güvenli bilgileri göster
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"Config (güvenli): {_CONFIG_INSTANCE.to_safe_dict()}")
+    """Sync config instance'ını döndürür (ilk çağrıda yüklenip doğrulanır, sonra cache'ten)."""
+    config = BotConfig.load()
+    config.validate()
+    logger.info("✅ Bot config yüklendi ve doğrulandı")
+    
+    # Debug log'da sadece güvenli bilgileri göster
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Config (güvenli): {config.to_safe_dict()}")
     
-    return _CONFIG_INSTANCE
+    return config
 
 
 async def get_config() -> BotConfig:
@@ -13,12 +13,15 @@ komut aciklaması yok (commat_info)> aktif dönemde anlamlı
 # zaman format: mbot1_0917_2043 (aygün_saaddkika) ESKİ: "%Y%m%d_%H%M%S" = YılAyGün_SaatDakikaSaniye
 """
 
+import asyncio
 import os
 import re
+import shutil
 import zipfile
 import tempfile
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from aiogram import Router
 from aiogram.types import Message, FSInputFile
@@ -37,47 +40,156 @@ TMP_DIR.mkdir(parents=True, exist_ok=True)
 TELEGRAM_NAME = os.getenv("TELEGRAM_NAME", "hbot")
 TELEGRAM_MSG_LIMIT = 4000
 
+# /dar t: bundan büyük dosyalar birleştirmeye alınmaz; kopya tamponu
+DAR_TXT_MAX_FILE_BYTES = 1_000_000
+_COPY_BUFFER_SIZE = 64 * 1024
+
+# /dar Z: hızlı DEFLATE seviyesi; zaten sıkıştırılmış dosyalar sıkıştırılmadan eklenir
+ZIP_COMPRESS_LEVEL = 1
+_ZIP_STORED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".zip", ".gz", ".bz2", ".xz", ".7z")
+
+# /dar k: eşzamanlı dosya okuma üst sınırı (FD tükenmesine karşı)
+SCAN_READ_CONCURRENCY = 32
+
+# Komut tarama deseni (import'ta bir kez derlenir). Tek alternation ile router
+# decorator'larındaki Command("x", ...) ve Command(commands=["x", ...]) biçimleri
+# dosya başına tek geçişte yakalanır.
+_COMMAND_PATTERN = re.compile(
+    r'@\w+\.message\(.*?Command\(\s*(?:'
+    r'["\'](?P<cmd>\w+)["\']'
+    r'|commands\s*=\s*\[\s*["\'](?P<cmds>\w+)["\']'
+    r')'
+)
+
 
 # -------------------------------
 # 📂 Proje ağaç yapısı üretici
 # -------------------------------
-def generate_tree(path: Path, prefix: str = "") -> str:
-    tree = ""
-    entries = sorted(path.iterdir(), key=lambda e: (e.is_file(), e.name.lower()))
-    for idx, entry in enumerate(entries):
-        if entry.name.startswith(".") or entry.name in ["__pycache__"]:
-            continue
-        connector = "└── " if idx == len(entries) - 1 else "├── "
-        tree += f"{prefix}{connector}{entry.name}\n"
-        if entry.is_dir():
-            extension = "    " if idx == len(entries) - 1 else "│   "
-            tree += generate_tree(entry, prefix + extension)
+def generate_tree(path: Path, prefix: str = "", dir_mtimes: Optional[Dict[str, int]] = None) -> str:
+    lines: List[str] = []
+    _walk_tree(os.fspath(path), prefix, lines, dir_mtimes)
+    return "".join(lines)
+
+
+def _walk_tree(dirpath: str, prefix: str, lines: List[str],
+               dir_mtimes: Optional[Dict[str, int]]) -> None:
+    # str yollar + DirEntry (tip bilgisi d_type'tan): girdi başına Path/stat yok
+    if dir_mtimes is not None:
+        # Listelemeden önce alınır: yürüyüş sırasında değişiklik olursa cache geçersiz kalır
+        dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+    with os.scandir(dirpath) as it:
+        entries = sorted(
+            (e.is_file(), e.name.lower(), e.name, e.path, e.is_dir())
+            for e in it
+            if not (e.name.startswith(".") or e.name == "__pycache__")
+        )
+    last = len(entries) - 1
+    for idx, (_, _, name, entry_path, is_dir) in enumerate(entries):
+        lines.append(f"{prefix}{'└── ' if idx == last else '├── '}{name}\n")
+        if is_dir:
+            _walk_tree(entry_path, prefix + ("    " if idx == last else "│   "), lines, dir_mtimes)
+
+
+# Ağaç cache'i: (yürünen dizin → mtime_ns, ağaç metni). Ağaç yalnızca isimlerden
+# oluştuğundan bir dizinde ekleme/silme/yeniden adlandırma o dizinin mtime'ını değiştirir.
+_tree_cache: Optional[Tuple[Dict[str, int], str]] = None
+
+
+def _tree_cache_valid(dir_mtimes: Dict[str, int]) -> bool:
+    try:
+        return all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items())
+    except OSError:
+        return False
+
+
+def get_project_tree() -> str:
+    """Proje ağacını döndürür; yürünen dizinlerin hiçbiri değişmediyse cache'ten."""
+    global _tree_cache
+    if _tree_cache is not None and _tree_cache_valid(_tree_cache[0]):
+        return _tree_cache[1]
+    dir_mtimes: Dict[str, int] = {}
+    tree = generate_tree(PROJECT_ROOT, dir_mtimes=dir_mtimes)
+    _tree_cache = (dir_mtimes, tree)
     return tree
 
 
 # -------------------------------
 # 🔍 handlers içindeki komut tarayıcı
 # -------------------------------
-def scan_handlers_for_commands():
+def _read_source(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", "replace")
+
+
+async def scan_handlers_for_commands():
     commands = {}
     handler_dir = PROJECT_ROOT / "handlers"
 
-    pattern = re.compile(r'@router\.message\(.*Command\(["\'](\w+)["\']')
-    for fname in os.listdir(handler_dir):
-        if not fname.endswith(".py") or fname.startswith("__"):
-            continue
-        fpath = handler_dir / fname
-        try:
-            with open(fpath, "r", encoding="utf-8") as f:
-                content = f.read()
-            matches = pattern.findall(content)
-            for cmd in matches:
-                commands[f"/{cmd}"] = f"({fname})"
-        except Exception:
+    # scandir: DirEntry ad/tip bilgisini taşır; elenen girdiler için Path/stat yok
+    with os.scandir(handler_dir) as it:
+        entries = [
+            e for e in it
+            if e.name.endswith(".py") and not e.name.startswith("__") and e.is_file()
+        ]
+
+    # Okumalar thread'lerde eşzamanlı: N dosya için ~tek dosya gecikmesi
+    sem = asyncio.Semaphore(SCAN_READ_CONCURRENCY)
+
+    async def read(entry: os.DirEntry):
+        async with sem:
+            try:
+                return entry.name, await asyncio.to_thread(_read_source, entry.path)
+            except Exception:
+                return entry.name, None
+
+    # gather sırayı korur: sonuç sıralı listeleme ile aynı
+    finditer = _COMMAND_PATTERN.finditer
+    for fname, content in await asyncio.gather(*(read(e) for e in entries)):
+        if content is None:
             continue
+        # Alternation'da yalnızca bir grup eşleşir → group(lastindex) komutun kendisi;
+        # açıklama etiketi dosya başına bir kez üretilir
+        label = f"({fname})"
+        commands.update({f"/{m.group(m.lastindex)}": label for m in finditer(content)})
     return commands
 
 
+# -------------------------------
+# 📄 Kod birleştirici (/dar t)
+# -------------------------------
+def write_code_dump(out_path: Path, tree_str: str) -> None:
+    """Proje ağacı + .py dosya içeriklerini out_path'e yazar.
+
+    Dosyalar binary olarak sabit tamponla kopyalanır: bellek kullanımı toplam
+    proje boyutuyla değil tampon boyutuyla sınırlı, decode/encode turu yok.
+    """
+    header = "\n".join((
+        "📁 PROJE AĞAÇ YAPISI\n",
+        tree_str,
+        "\n" + "=" * 50 + "\n",
+        "📄 DOSYA İÇERİKLERİ\n",
+        "=" * 50 + "\n",
+    ))
+    with open(out_path, "wb") as out:
+        out.write(header.encode("utf-8"))
+        for dirpath, _, filenames in os.walk(PROJECT_ROOT):
+            for fname in sorted(filenames):
+                if fname.startswith(".") or not fname.endswith(".py"):
+                    continue
+
+                file_path = os.path.join(dirpath, fname)
+                try:
+                    if os.stat(file_path).st_size > DAR_TXT_MAX_FILE_BYTES:
+                        continue
+                    with open(file_path, "rb") as src:
+                        rel_path = os.path.relpath(file_path, PROJECT_ROOT).replace(os.sep, "/")
+                        out.write(f"\n\n{'=' * 30}\n|| {rel_path} ||\n{'=' * 30}\n".encode("utf-8"))
+                        shutil.copyfileobj(src, out, _COPY_BUFFER_SIZE)
+                        out.write(b"\n")
+                except OSError:
+                    continue
+
+
 # -------------------------------
 # 🎯 Komut Handler
 # -------------------------------
@@ -91,7 +203,7 @@ async def dar_command(message: Message):
 
     # --- Komut Tarama (/dar k)
     if mode == "k":
-        scanned = scan_handlers_for_commands()
+        scanned = await scan_handlers_for_commands()
         lines = [f"{cmd} → {desc}" for cmd, desc in sorted(scanned.items())]
         text = "\n".join(lines) if lines else "❌ Komut bulunamadı."
         await message.answer(f"<pre>{text}</pre>", parse_mode="HTML")
@@ -99,54 +211,20 @@ async def dar_command(message: Message):
 
     # --- TXT Kod Birleştir (/dar t) - PROJE AĞAÇ YAPISI EKLENDİ
     if mode == "t":
-        content_blocks = []
-
-        # Önce proje ağaç yapısını ekle
-        tree_str = generate_tree(PROJECT_ROOT)
-        content_blocks.append("📁 PROJE AĞAÇ YAPISI\n")
-        content_blocks.append(tree_str)
-        content_blocks.append("\n" + "="*50 + "\n")
-        content_blocks.append("📄 DOSYA İÇERİKLERİ\n")
-        content_blocks.append("="*50 + "\n")
-
-        # Sonra dosya içeriklerini ekle
-        for dirpath, _, filenames in os.walk(PROJECT_ROOT):
-            for fname in sorted(filenames):
-                if fname.startswith(".") or not fname.endswith(".py"):
-                    continue
-
-                file_path = Path(dirpath) / fname
-                rel_path = file_path.relative_to(PROJECT_ROOT)
-
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        file_content = f.read()
-                except Exception:
-                    continue
-
-                block = (
-                    "\n" + "=" * 30 + "\n"
-                    f"|| {rel_path.as_posix()} ||\n"
-                    + "=" * 30 + "\n"
-                    + file_content.strip() + "\n"
-                )
-                content_blocks.append(block)
-
-        full_content = "\n".join(content_blocks)
-
-        if len(full_content) > TELEGRAM_MSG_LIMIT:
-            txt_path = TMP_DIR / f"{TELEGRAM_NAME}_{timestamp}.txt"
-            try:
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write(full_content)
+        txt_path = TMP_DIR / f"{TELEGRAM_NAME}_{timestamp}.txt"
+        try:
+            # Çıktı diske stream edilir; kısa kalırsa mesaj olarak geri okunur
+            write_code_dump(txt_path, get_project_tree())
+            if txt_path.stat().st_size > TELEGRAM_MSG_LIMIT:
                 await message.answer_document(FSInputFile(str(txt_path)))
-            except Exception as e:
-                await message.answer(f"Hata oluştu: {e}")
-            finally:
-                if txt_path.exists():
-                    txt_path.unlink()
-        else:
-            await message.answer(f"<pre>{full_content}</pre>", parse_mode="HTML")
+            else:
+                full_content = txt_path.read_text(encoding="utf-8")
+                await message.answer(f"<pre>{full_content}</pre>", parse_mode="HTML")
+        except Exception as e:
+            await message.answer(f"Hata oluştu: {e}")
+        finally:
+            if txt_path.exists():
+                txt_path.unlink()
 
         return
 
@@ -154,15 +232,19 @@ async def dar_command(message: Message):
     if mode.upper() == "Z":
         zip_path = TMP_DIR / f"{TELEGRAM_NAME}_{timestamp}.zip"
         try:
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED,
+                                 compresslevel=ZIP_COMPRESS_LEVEL) as zipf:
                 for root, _, files in os.walk(PROJECT_ROOT):
                     for file in files:
                         if file.startswith(".") or file.endswith((".pyc", ".pyo")):
                             continue
                         file_path = Path(root) / file
                         rel_path = file_path.relative_to(PROJECT_ROOT)
+                        compress_type = (
+                            zipfile.ZIP_STORED if file.lower().endswith(_ZIP_STORED_EXTENSIONS) else None
+                        )
                         try:
-                            zipf.write(file_path, rel_path)
+                            zipf.write(file_path, rel_path, compress_type=compress_type)
                         except Exception:
                             continue
             await message.answer_document(FSInputFile(str(zip_path)))
@@ -174,7 +256,7 @@ async def dar_command(message: Message):
         return
 
     # --- Varsayılan (/dar → ağaç mesaj)
-    tree_str = generate_tree(PROJECT_ROOT)
+    tree_str = get_project_tree()
     if len(tree_str) > TELEGRAM_MSG_LIMIT:
         txt_path = TMP_DIR / f"{TELEGRAM_NAME}_{timestamp}.txt"
         try:
@@ -51,6 +51,9 @@ from utils.handler_loader import load_handlers, clear_handler_cache
 from utils.binance.binance_a import get_or_create_binance_api  # ✅ DÜZELTME: Factory fonksiyonunu import et
 from utils.binance.binance_request import BinanceHTTPClient
 from utils.binance.binance_circuit_breaker import CircuitBreaker
+from utils.binance.binance_utils import enable_uvloop
+from analysis.onchain import close_onchain_analyzers
+from analysis.risk import close_risk_managers
 from config import BotConfig, get_config, get_telegram_token, get_admins
 
 # ---------------------------------------------------------------------
@@ -356,6 +359,11 @@ async def lifespan():
         if binance_api:
             cleanup_tasks.append(binance_api.close())
         
+        # get_onchain_analyzer() ile paylaşılan (handler + AnalysisAggregator) instance'lar
+        cleanup_tasks.append(close_onchain_analyzers())
+        # Paylaşılan RiskManager'lar: in-flight makro istekleri + HTTP session
+        cleanup_tasks.append(close_risk_managers())
+        
         if bot and hasattr(bot, 'session'):
             cleanup_tasks.append(bot.session.close())
         
@@ -712,6 +720,12 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
+    # uvloop (libuv) varsa event loop olarak kullan; Binance HTTP/WS I/O ve task
+    # scheduling C seviyesinde çalışır. BinanceAPI singleton'ı main() içinde,
+    # yani bu loop altında oluşturulur. Yoksa (ör. Windows) default asyncio loop.
+    if enable_uvloop():
+        logger.info("⚡ uvloop event loop policy enabled")
+
     # Run the application
     try:
         asyncio.run(main())
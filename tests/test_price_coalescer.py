@@ -0,0 +1,122 @@
+"""_PriceCoalescer davranış testleri (tek sembol, toplu fetch, hata ve iptal yayılımı)."""
+
+import asyncio
+
+import pytest
+
+binance_a = pytest.importorskip("utils.binance.binance_a")
+binance_exceptions = pytest.importorskip("utils.binance.binance_exceptions")
+
+_PriceCoalescer = binance_a._PriceCoalescer
+BinanceAPIError = binance_exceptions.BinanceAPIError
+
+
+class FakeTicker:
+    """get_symbol_price / get_all_symbol_prices yerine geçen kayıt tutan fetcher'lar."""
+
+    def __init__(self, prices, error=None, gate=None):
+        self.prices = prices
+        self.error = error
+        self.gate = gate
+        self.one_calls = []
+        self.all_calls = 0
+
+    async def fetch_one(self, symbol):
+        self.one_calls.append(symbol)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        if symbol not in self.prices:
+            raise BinanceAPIError(f"Error getting symbol price for {symbol}: invalid symbol")
+        return {"symbol": symbol, "price": str(self.prices[symbol])}
+
+    async def fetch_all(self):
+        self.all_calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return [{"symbol": s, "price": str(p)} for s, p in self.prices.items()]
+
+
+def _coalescer(ticker):
+    return _PriceCoalescer(fetch_all=ticker.fetch_all, fetch_one=ticker.fetch_one)
+
+
+def test_single_symbol_uses_symbol_price():
+    async def main():
+        ticker = FakeTicker({"BTCUSDT": 50000.0, "ETHUSDT": 3000.0})
+        price = await _coalescer(ticker).get("BTCUSDT")
+        return ticker, price
+
+    ticker, price = asyncio.run(main())
+    assert price == 50000.0
+    assert ticker.one_calls == ["BTCUSDT"]
+    assert ticker.all_calls == 0
+
+
+def test_concurrent_symbols_share_one_batched_fetch():
+    async def main():
+        ticker = FakeTicker({"BTCUSDT": 50000.0, "ETHUSDT": 3000.0, "BNBUSDT": 600.0})
+        coalescer = _coalescer(ticker)
+        prices = await asyncio.gather(
+            coalescer.get("BTCUSDT"), coalescer.get("ETHUSDT"),
+            coalescer.get("BNBUSDT"), coalescer.get("BTCUSDT"),
+        )
+        return ticker, prices
+
+    ticker, prices = asyncio.run(main())
+    assert prices == [50000.0, 3000.0, 600.0, 50000.0]
+    assert ticker.all_calls == 1
+    assert ticker.one_calls == []
+
+
+def test_fetch_error_reaches_every_waiter():
+    async def main():
+        error = BinanceAPIError("boom")
+        ticker = FakeTicker({}, error=error)
+        coalescer = _coalescer(ticker)
+        results = await asyncio.gather(
+            coalescer.get("BTCUSDT"), coalescer.get("ETHUSDT"), coalescer.get("BTCUSDT"),
+            return_exceptions=True,
+        )
+        return error, results
+
+    error, results = asyncio.run(main())
+    assert results == [error, error, error]
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def main():
+        gate = asyncio.Event()
+        ticker = FakeTicker({"BTCUSDT": 50000.0}, gate=gate)
+        coalescer = _coalescer(ticker)
+        first = asyncio.create_task(coalescer.get("BTCUSDT"))
+        second = asyncio.create_task(coalescer.get("BTCUSDT"))
+        # Flush penceresi geçsin, fetch gate'te beklesin
+        while not ticker.one_calls:
+            await asyncio.sleep(0.005)
+        first.cancel()
+        gate.set()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first_result, second_result = asyncio.run(main())
+    assert isinstance(first_result, asyncio.CancelledError)
+    assert second_result == 50000.0
+
+
+def test_unknown_symbol_raises_on_both_paths():
+    async def main():
+        ticker = FakeTicker({"BTCUSDT": 50000.0})
+        coalescer = _coalescer(ticker)
+        single = await asyncio.gather(coalescer.get("NOPEUSDT"), return_exceptions=True)
+        batched = await asyncio.gather(
+            coalescer.get("BTCUSDT"), coalescer.get("NOPEUSDT"), return_exceptions=True
+        )
+        return single, batched
+
+    (single,), (known, unknown) = asyncio.run(main())
+    assert isinstance(single, BinanceAPIError)
+    assert known == 50000.0
+    assert isinstance(unknown, BinanceAPIError)
@@ -23,18 +23,22 @@ Tüm Binance API endpoint'lerine tek bir noktadan erişim sağlar.
 
 import logging
 import asyncio
-import json
-from typing import Optional, AsyncContextManager, Dict, Any, List, Set, Union, Callable
+from typing import Optional, Dict, Any, List, Set, Tuple, Union, Callable, Hashable
 from contextlib import asynccontextmanager
+from collections import OrderedDict
 from pydantic import BaseSettings, validator
 from datetime import datetime
 from functools import wraps
 import time
 
+import numpy as np
+
 # Relative imports for same package
 from .binance_request import BinanceHTTPClient
 from .binance_circuit_breaker import CircuitBreaker
 from .binance_exceptions import BinanceAPIError, BinanceCircuitBreakerError
+from .binance_json import dumps
+from .binance_utils import klines_to_arrays
 
 # Public API'ler
 from .binance_public import BinanceSpotPublicAPI, BinanceFuturesPublicAPI
@@ -99,11 +103,11 @@ def structured_log(level: str, message: str, **kwargs):
     }
     
     if level == "ERROR":
-        logger.error(json.dumps(log_entry))
+        logger.error(dumps(log_entry))
     elif level == "WARNING":
-        logger.warning(json.dumps(log_entry))
+        logger.warning(dumps(log_entry))
     else:
-        logger.info(json.dumps(log_entry))
+        logger.info(dumps(log_entry))
 
 def monitor_performance(func):
     """Performance monitoring decorator"""
@@ -154,11 +158,24 @@ def _scrub_sensitive_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
     return scrubbed
 
 
+# Cache key prefix'ine göre TTL (saniye). 0 = hiç cache'lenmez, listede yoksa Cache default TTL'i.
+# exchangeInfo nadiren değişir ve pahalıdır; server time / order book anlık olmalı.
+CACHE_TTL_BY_PREFIX: Dict[str, float] = {
+    "server_time": 0,
+    "exchange_info": 3600,
+    "orderbook": 1.0,
+    "book_ticker": 1.0,
+    "mark_price": 1.0,
+    "tickers_24h": 5.0,
+}
+
+
 class Cache:
-    """Thread-safe caching mechanism with TTL and automatic cleanup."""
+    """Thread-safe LRU caching mechanism with TTL and automatic cleanup."""
     
     def __init__(self, ttl: int = 60, max_size: Optional[int] = None):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # OrderedDict: en az kullanılan başta, eviction popitem(last=False) ile O(1)
+        self._cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
         self._ttl = ttl
         self._max_size = max_size
         self._lock = asyncio.Lock()
@@ -166,14 +183,15 @@ class Cache:
         self._misses = 0
         self._evictions = 0
     
-    async def get(self, key: str) -> Optional[Any]:
+    async def get(self, key: Hashable) -> Optional[Any]:
         """Get data from cache with TTL validation."""
         async with self._lock:
             entry = self._cache.get(key)
             current_time = time.time()
             
             if entry:
-                if current_time - entry['timestamp'] < self._ttl:
+                if current_time - entry['timestamp'] < entry['ttl']:
+                    self._cache.move_to_end(key)
                     self._hits += 1
                     return entry['data']
                 else:
@@ -184,18 +202,20 @@ class Cache:
             self._misses += 1
             return None
     
-    async def set(self, key: str, data: Any) -> None:
-        """Store data in cache with timestamp."""
+    async def set(self, key: Hashable, data: Any, ttl: Optional[float] = None) -> None:
+        """Store data in cache with timestamp (ttl overrides the default TTL)."""
         async with self._lock:
-            if self._max_size and len(self._cache) >= self._max_size:
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif self._max_size and len(self._cache) >= self._max_size:
+                oldest_key, _ = self._cache.popitem(last=False)
                 self._evictions += 1
-                logger.debug(f"♻️ Cache evicted oldest entry: {oldest_key}")
+                logger.debug(f"♻️ Cache evicted least recently used entry: {oldest_key}")
             
             self._cache[key] = {
                 'data': data,
-                'timestamp': time.time()
+                'timestamp': time.time(),
+                'ttl': self._ttl if ttl is None else ttl
             }
             logger.debug(f"💾 Cache stored: {key}")
     
@@ -211,7 +231,7 @@ class Cache:
             current_time = time.time()
             expired_keys = [
                 key for key, entry in self._cache.items()
-                if current_time - entry['timestamp'] >= self._ttl
+                if current_time - entry['timestamp'] >= entry['ttl']
             ]
             
             for key in expired_keys:
@@ -282,16 +302,111 @@ class OptimizedCache(Cache):
 
 
 
+class _PriceCoalescer:
+    """
+    Kısa bir pencere içinde gelen eşzamanlı fiyat isteklerini tek fetch'te birleştirir.
+    
+    N sembol için N ayrı /ticker/price çağrısı yerine pencere sonunda tek bir
+    tüm-semboller çağrısı yapılır ve bekleyen tüm future'lar çözülür.
+    Bilinmeyen sembol her iki yolda da BinanceAPIError ile sonuçlanır.
+    """
+    
+    def __init__(self, fetch_all: Callable, fetch_one: Callable, window: float = 0.01):
+        self._fetch_all = fetch_all
+        self._fetch_one = fetch_one
+        self._window = window
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def get(self, symbol: str) -> float:
+        """
+        Get price for symbol, sharing the fetch with concurrent callers.
+        
+        Raises:
+            BinanceAPIError: Fetch failed or symbol unknown (single and batched path alike)
+        """
+        future = self._pending.get(symbol)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[symbol] = future
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        # shield: iptal edilen çağıran, aynı sembolü bekleyen diğerlerinin future'ını iptal etmez
+        return await asyncio.shield(future)
+    
+    async def _flush(self) -> None:
+        """Wait for the debounce window, then resolve all pending futures."""
+        await asyncio.sleep(self._window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        
+        try:
+            if len(pending) == 1:
+                symbol = next(iter(pending))
+                data = await self._fetch_one(symbol)
+                prices = {symbol: float(data['price'])}
+            else:
+                prices = {p['symbol']: float(p['price']) for p in await self._fetch_all()}
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for symbol, future in pending.items():
+            if future.done():
+                continue
+            price = prices.get(symbol)
+            if price is None:
+                # Tek sembol yolu (get_symbol_price) ile aynı davranış
+                future.set_exception(BinanceAPIError(f"Error getting symbol price for {symbol}: unknown symbol"))
+            else:
+                future.set_result(price)
+    
+    def cancel(self) -> None:
+        """Cancel the pending flush and all waiting callers."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+
 # -----------------------------
 # Public Aggregator (Yeni Yapı)
 # -----------------------------
 
+# Alt client metodlarının aggregator üzerine doğrudan bağlanan isimleri.
+# Wrapper coroutine yerine bound method atanır: ekstra frame/await yok.
+_PUBLIC_SPOT_FORWARDS = (
+    "ping", "get_server_time", "get_exchange_info", "get_symbol_price", "get_all_symbol_prices",
+    "get_order_book", "get_recent_trades", "get_klines", "get_all_24h_tickers",
+    "get_all_symbols", "get_book_ticker", "get_avg_price", "get_agg_trades",
+    "get_ui_klines", "symbol_exists", "get_all_book_tickers",
+)
+_PUBLIC_FUTURES_FORWARDS = (
+    "get_futures_exchange_info", "get_futures_order_book", "get_futures_klines",
+    "get_futures_mark_price", "get_futures_24hr_ticker", "get_funding_rate",
+    "get_open_interest", "get_top_long_short_ratio", "get_taker_buy_sell_volume",
+    "get_global_long_short_ratio", "get_futures_funding_rate_history",
+    "get_all_futures_symbols", "futures_symbol_exists",
+)
+
+
 class BinancePublic:
     """Public API aggregator (no API key required)."""
     
     def __init__(self, http: BinanceHTTPClient, breaker: CircuitBreaker) -> None:
         self.spot = BinanceSpotPublicAPI(http, breaker)
         self.futures = BinanceFuturesPublicAPI(http, breaker)
+        
+        # public.get_klines(...) -> spot.get_klines (attribute aliasing)
+        for name in _PUBLIC_SPOT_FORWARDS:
+            setattr(self, name, getattr(self.spot, name))
+        for name in _PUBLIC_FUTURES_FORWARDS:
+            setattr(self, name, getattr(self.futures, name))
 
 
 # -----------------------------
@@ -317,11 +432,20 @@ class BinancePrivate:
 # Main Aggregator Class
 # -----------------------------
 # class-based kullanılacak
-class BinanceAPI(AsyncContextManager):
+class BinanceAPI:
     """Geliştirilmiş Binance API aggregator - Tüm yeni client'ler entegre"""
     _instance: Optional["BinanceAPI"] = None
     _initialization_lock = asyncio.Lock()
     
+    # Sabit attribute seti: instance __dict__ yok, attribute erişimi slot descriptor ile.
+    # (AsyncContextManager base'i __dict__ getirdiği için kaldırıldı; __aenter__/__aexit__
+    # tanımlı olduğundan isinstance(api, AbstractAsyncContextManager) hâlâ True.)
+    __slots__ = (
+        "http", "circuit_breaker", "_cache", "_config", "public", "private",
+        "_last_request_time", "_min_request_interval",
+        "_request_count", "_total_request_time", "_price_coalescer",
+    )
+    
 
         
     # Global fonksiyonları class method'larına dönüştürme
@@ -404,26 +528,18 @@ class BinanceAPI(AsyncContextManager):
             return cls._instance
  
 
-    def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
-        """Daha güvenli ve optimize cache key generation"""
-        import hashlib
-        import json
+    def _generate_cache_key(self, prefix: str, *args, **kwargs) -> Tuple[Any, ...]:
+        """
+        Tuple cache key: JSON serialization + sha256 + f-string yerine
+        hashable tuple (hash CPython tarafından bir kez hesaplanır).
+        Expiry entry bazlı TTL ile yapılır (CACHE_TTL_BY_PREFIX), key'de zaman penceresi yok.
+        """
+        kw = tuple(sorted(
+            (k, v) for k, v in kwargs.items()
+            if v is not None and not k.startswith('_')
+        )) if kwargs else ()
         
-        # Parametreleri normalize et
-        params = {
-            'args': [str(arg) for arg in args if arg is not None],
-            'kwargs': {k: str(v) for k, v in kwargs.items() 
-                      if v is not None and not k.startswith('_')}
-        }
-        
-        # JSON serialization ile daha güvenli key
-        params_str = json.dumps(params, sort_keys=True, separators=(',', ':'))
-        time_window = int(time.time()) // max(getattr(self._cache, '_ttl', 60), 1)
-        
-        # Hash kullanarak key uzunluğunu kontrol et
-        hash_digest = hashlib.sha256(params_str.encode()).hexdigest()[:16]
-        
-        return f"bnc_{prefix}_{hash_digest}_w{time_window}"
+        return (prefix, tuple(arg for arg in args if arg is not None), kw)
 
     def _normalize_param(self, param: Any) -> str:
         """Parametreleri string'e çevir ve normalize et"""
@@ -458,6 +574,12 @@ class BinanceAPI(AsyncContextManager):
         self.public = BinancePublic(http_client, circuit_breaker)
         self.private = BinancePrivate(http_client, circuit_breaker)
         
+        # Eşzamanlı get_price çağrıları tek /ticker/price isteğinde birleşir
+        self._price_coalescer = _PriceCoalescer(
+            fetch_all=self.public.spot.get_all_symbol_prices,
+            fetch_one=self.public.spot.get_symbol_price,
+        )
+        
         # Rate limiting configuration
         self._last_request_time = 0
         self._min_request_interval = 1.0 / self._config.get("requests_per_second", 10)
@@ -538,7 +660,7 @@ class BinanceAPI(AsyncContextManager):
         self._last_request_time = time.time()
 
     #h
-    async def _handle_request_error(self, error: Exception, cache_key: str, 
+    async def _handle_request_error(self, error: Exception, cache_key: Hashable, 
                                   func_name: str, metrics: Dict[str, Any]) -> None:
         """Merkezi error handling"""
         error_type = type(error).__name__
@@ -566,7 +688,7 @@ class BinanceAPI(AsyncContextManager):
 
 
     @retry(max_retries=3, delay=1.0, backoff=2.0)
-    async def _cached_request(self, cache_key: str, func: Callable, *args, **kwargs) -> Any:
+    async def _cached_request(self, cache_key: Hashable, func: Callable, *args, **kwargs) -> Any:
         """Geliştirilmiş metriklerle request handling"""
         start_time = time.time()
         metrics = {
@@ -575,9 +697,13 @@ class BinanceAPI(AsyncContextManager):
             'response_time': 0.0
         }
         
+        # Prefix bazlı TTL; 0 ise cache tamamen atlanır
+        ttl = CACHE_TTL_BY_PREFIX.get(cache_key[0])
+        use_cache = self._cache is not None and ttl != 0
+        
         try:
             # Cache check with metrics
-            if self._cache:
+            if use_cache:
                 cached_data = await self._cache.get(cache_key)
                 if cached_data is not None:
                     metrics['cache_hit'] = True
@@ -596,8 +722,8 @@ class BinanceAPI(AsyncContextManager):
             data = await func(*args, **kwargs)
             
             # Cache successful responses
-            if self._cache and data is not None:
-                asyncio.create_task(self._cache.set(cache_key, data))  # Async cache set
+            if use_cache and data is not None:
+                asyncio.create_task(self._cache.set(cache_key, data, ttl))  # Async cache set
             
             await self.circuit_breaker.record_success()
             
@@ -618,18 +744,31 @@ class BinanceAPI(AsyncContextManager):
     
     ##
     async def close(self) -> None:
-        """Cleanup resources and close connections."""
+        """Cleanup resources, close connections and release singleton references."""
+        global _binance_api_instance
         cleanup_tasks = []
         
+        if hasattr(self, '_price_coalescer'):
+            self._price_coalescer.cancel()
+        
         if hasattr(self, 'http'):
             cleanup_tasks.append(self.http.close())
         
         if hasattr(self, '_cache'):
-            cleanup_tasks.append(self._cache.cleanup())
+            cleanup_tasks.append(self._cache.clear())
         
         if cleanup_tasks:
             await asyncio.gather(*cleanup_tasks, return_exceptions=True)
         
+        # Singleton referanslarını bırak: sonraki create() yeni http client ile kurulur.
+        # Public client'ler de singleton olduğundan kapatılmış http'ye bağlı kalmamalı.
+        if BinanceAPI._instance is self:
+            BinanceAPI._instance = None
+        if _binance_api_instance is self:
+            _binance_api_instance = None
+        BinanceSpotPublicAPI._instance = None
+        BinanceFuturesPublicAPI._instance = None
+        
         logger.info("✅ BinanceAPI resources cleaned up successfully")
     
     async def __aenter__(self) -> "BinanceAPI":
@@ -676,6 +815,12 @@ class BinanceAPI(AsyncContextManager):
             return await self._cached_request(cache_key, self.public.spot.get_klines, symbol, interval, limit)
     
     
+    async def get_klines_arrays(self, symbol: str, interval: str = "1h", limit: int = 500,
+                                futures: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Get klines as (timestamps, OHLCV) NumPy arrays - pandas katmanı olmadan."""
+        klines = await self.get_klines(symbol, interval, limit, futures=futures)
+        return klines_to_arrays(klines)
+    
     async def get_server_time(self) -> Dict[str, Any]:
         cache_key = self._generate_cache_key("server_time")
         return await self._cached_request(cache_key, self.public.spot.get_server_time)
@@ -842,6 +987,36 @@ class BinanceAPI(AsyncContextManager):
             logger.error(f"❌ Failed to get volume leaders: {e}")
             return []
     
+    async def get_all_book_tickers_soa(self) -> Dict[str, np.ndarray]:
+        """
+        Get all book tickers as column arrays (symbol, bid, ask, bid_qty, ask_qty).
+        
+        Scanner'lar dict listesi yerine contiguous NumPy dizileri üzerinde
+        vektörel filtre uygulayabilir (ör. bid[mask]).
+        """
+        tickers = await self.get_book_ticker()
+        if isinstance(tickers, dict):
+            tickers = [tickers]
+        n = len(tickers)
+        return {
+            'symbol': np.array([t['symbol'] for t in tickers], dtype='U16'),
+            'bid': np.fromiter((float(t['bidPrice']) for t in tickers), dtype=np.float64, count=n),
+            'ask': np.fromiter((float(t['askPrice']) for t in tickers), dtype=np.float64, count=n),
+            'bid_qty': np.fromiter((float(t['bidQty']) for t in tickers), dtype=np.float64, count=n),
+            'ask_qty': np.fromiter((float(t['askQty']) for t in tickers), dtype=np.float64, count=n),
+        }
+    
+    async def get_all_24h_tickers_soa(self) -> Dict[str, np.ndarray]:
+        """Get all 24h tickers as column arrays (symbol, last_price, change_pct, quote_volume)."""
+        tickers = await self.get_all_24h_tickers()
+        n = len(tickers)
+        return {
+            'symbol': np.array([t['symbol'] for t in tickers], dtype='U16'),
+            'last_price': np.fromiter((float(t.get('lastPrice', 0)) for t in tickers), dtype=np.float64, count=n),
+            'change_pct': np.fromiter((float(t.get('priceChangePercent', 0)) for t in tickers), dtype=np.float64, count=n),
+            'quote_volume': np.fromiter((float(t.get('quoteVolume', 0)) for t in tickers), dtype=np.float64, count=n),
+        }
+    
     # -------------------------------------------------------------------------
     # ADVANCED AGGREGATION METHODS
     # -------------------------------------------------------------------------
@@ -872,6 +1047,25 @@ class BinanceAPI(AsyncContextManager):
         except Exception as e:
             logger.error(f"❌ Error getting unified account summary: {e}")
             return {}
+    async def get_account_overview(self) -> Dict[str, Any]:
+        """Get spot, futures and margin account info concurrently (tek round-trip süresi)."""
+        spot, futures, margin = await asyncio.gather(
+            self.private.spot.get_account_info(),
+            self.private.futures.get_account_info(),
+            self.private.margin.get_account_info(),
+            return_exceptions=True
+        )
+        
+        overview: Dict[str, Any] = {'timestamp': datetime.now().isoformat()}
+        for name, result in (('spot', spot), ('futures', futures), ('margin', margin)):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ {name} account info not available: {result}")
+                overview[name] = None
+            else:
+                overview[name] = result
+        
+        return overview
+    
     #
     # Portfolio Snapshot
     async def get_portfolio_snapshot(self, base_currency: str = "USDT") -> Dict[str, Any]:
@@ -1207,8 +1401,7 @@ class BinanceAPI(AsyncContextManager):
                 ticker = await self.public.futures.get_futures_24hr_ticker(symbol)
                 return float(ticker.get('lastPrice', 0))
             else:
-                price_data = await self.public.spot.get_symbol_price(symbol)
-                return float(price_data.get('price', 0))
+                return await self._price_coalescer.get(symbol.upper().strip())
         except Exception as e:
             logger.error(f"Error getting price for {symbol}: {e}")
             return None
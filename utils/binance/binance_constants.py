@@ -19,6 +19,51 @@ RATE_LIMIT_IP: Final[int] = 1200  # Requests per minute for IP
 RATE_LIMIT_ORDER: Final[int] = 10  # Orders per second
 RATE_LIMIT_RAW_REQUESTS: Final[int] = 5000  # Raw requests per 5 minutes
 
+# Request weights per endpoint (IP limit is weight based, not request count)
+DEFAULT_ENDPOINT_WEIGHT: Final[int] = 1
+ENDPOINT_WEIGHTS: Final[Dict[str, int]] = {
+    # Spot public
+    "/api/v3/ping": 1,
+    "/api/v3/time": 1,
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/depth": 5,
+    "/api/v3/trades": 25,
+    "/api/v3/aggTrades": 4,
+    "/api/v3/klines": 2,
+    "/api/v3/uiKlines": 2,
+    "/api/v3/avgPrice": 2,
+    "/api/v3/ticker/24hr": 2,
+    "/api/v3/ticker/price": 2,
+    "/api/v3/ticker/bookTicker": 2,
+    # Spot private
+    "/api/v3/account": 20,
+    "/api/v3/openOrders": 6,
+    "/api/v3/allOrders": 20,
+    "/api/v3/myTrades": 20,
+    # Futures public
+    "/fapi/v1/exchangeInfo": 1,
+    "/fapi/v1/depth": 5,
+    "/fapi/v1/klines": 5,
+    "/fapi/v1/ticker/24hr": 1,
+    "/fapi/v1/openInterest": 1,
+    "/fapi/v1/fundingRate": 1,
+    "/fapi/v1/premiumIndex": 1,
+    # Futures private
+    "/fapi/v2/account": 5,
+    "/fapi/v2/balance": 5,
+    "/fapi/v2/positionRisk": 5,
+}
+
+# Weights when the endpoint is called without a "symbol" parameter (all symbols)
+ENDPOINT_WEIGHTS_ALL_SYMBOLS: Final[Dict[str, int]] = {
+    "/api/v3/ticker/24hr": 80,
+    "/api/v3/ticker/price": 4,
+    "/api/v3/ticker/bookTicker": 4,
+    "/api/v3/openOrders": 80,
+    "/fapi/v1/ticker/24hr": 40,
+    "/fapi/v1/openOrders": 40,
+}
+
 # Time Intervals
 INTERVALS: Final[List[str]] = [
     "1m", "3m", "5m", "15m", "30m",
@@ -0,0 +1,38 @@
+"""
+JSON backend selection for the Binance package.
+
+orjson → ujson → stdlib json sırasıyla import anında seçilir; modüller
+``json``/``orjson`` yerine buradaki ``loads``/``dumps`` kullanır.
+"""
+
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+
+    BACKEND: str = "orjson"
+    JSONDecodeError = orjson.JSONDecodeError
+    loads: Callable[[Union[str, bytes, bytearray]], Any] = orjson.loads
+
+    def dumps(obj: Any) -> str:
+        """Serialize to str (orjson bytes döndürür)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+except ImportError:
+    try:
+        import ujson
+
+        BACKEND = "ujson"
+        JSONDecodeError = ujson.JSONDecodeError
+        loads = ujson.loads
+        dumps = ujson.dumps
+
+    except ImportError:
+        import json
+
+        BACKEND = "json"
+        JSONDecodeError = json.JSONDecodeError
+        loads = json.loads
+        dumps = json.dumps
+
+__all__ = ["BACKEND", "JSONDecodeError", "dumps", "loads"]
@@ -11,7 +11,7 @@ import time
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
-from collections import deque
+from collections import Counter, deque
 from threading import Lock
 import statistics
 import logging
@@ -28,7 +28,7 @@ class RequestMetrics:
     failed_requests: int = 0
     total_response_time: float = 0
     response_times: deque = field(default_factory=lambda: deque(maxlen=1000))
-    errors_by_type: Dict[str, int] = field(default_factory=dict)
+    errors_by_type: Counter = field(default_factory=Counter)
 
 @dataclass
 class RateLimitMetrics:
@@ -88,9 +88,7 @@ class AdvancedMetrics:
             else:
                 self.request_metrics.failed_requests += 1
                 if error_type:
-                    self.request_metrics.errors_by_type[error_type] = (
-                        self.request_metrics.errors_by_type.get(error_type, 0) + 1
-                    )
+                    self.request_metrics.errors_by_type[error_type] += 1
     
     async def record_rate_limit(self, weight_used: int = 1) -> None:
         """
@@ -118,7 +116,8 @@ class AdvancedMetrics:
     async def get_metrics(self) -> Dict[str, Any]:
         """Get all current metrics asynchronously."""
         async with self._async_lock:
-            response_times = list(self.request_metrics.response_times)
+            # Tek sıralama: min/max/p95/p99 aynı sıralı pencereden okunur
+            response_times = sorted(self.request_metrics.response_times)
             
             # Calculate statistics safely
             total_requests = self.request_metrics.total_requests
@@ -131,8 +130,8 @@ class AdvancedMetrics:
             )
             
             # Percentile calculation
-            p95_response_time = self._calculate_percentile(response_times, 0.95)
-            p99_response_time = self._calculate_percentile(response_times, 0.99)
+            p95_response_time = self._calculate_percentile(response_times, 0.95, presorted=True)
+            p99_response_time = self._calculate_percentile(response_times, 0.99, presorted=True)
             
             # Time-based calculations
             uptime_seconds = time.time() - self.start_time
@@ -154,8 +153,8 @@ class AdvancedMetrics:
                     if total_requests > 0 else 100
                 ),
                 "average_response_time": avg_response_time,
-                "min_response_time": min(response_times) if response_times else 0,
-                "max_response_time": max(response_times) if response_times else 0,
+                "min_response_time": response_times[0] if response_times else 0,
+                "max_response_time": response_times[-1] if response_times else 0,
                 "p95_response_time": p95_response_time,
                 "p99_response_time": p99_response_time,
                 "current_rpm": current_rpm,
@@ -170,13 +169,14 @@ class AdvancedMetrics:
                 "last_reset_seconds_ago": time.time() - self.rate_limit_metrics.last_reset_time,
             }
     
-    def _calculate_percentile(self, data: List[float], percentile: float) -> float:
+    def _calculate_percentile(self, data: List[float], percentile: float,
+                              presorted: bool = False) -> float:
         """Calculate percentile safely."""
         if not data:
             return 0.0
         
         try:
-            sorted_data = sorted(data)
+            sorted_data = data if presorted else sorted(data)
             index = int(len(sorted_data) * percentile)
             return sorted_data[min(index, len(sorted_data) - 1)]
         except (IndexError, ValueError, TypeError):
@@ -121,6 +121,17 @@ class BinanceSpotPublicAPI(BaseBinanceAPI):
             logger.exception("Error getting symbol price for %s", symbol)
             raise BinanceAPIError(f"Error getting symbol price for {symbol}: {e}")
 
+    async def get_all_symbol_prices(self) -> List[Dict[str, Any]]:
+        """Get current prices for all symbols in a single request."""
+        try:
+            logger.debug("Requesting all symbol prices.")
+            return await self.circuit_breaker.execute(
+                self.http._request, "GET", "/api/v3/ticker/price"
+            )
+        except Exception as e:
+            logger.exception("Error getting all symbol prices.")
+            raise BinanceAPIError(f"Error getting all symbol prices: {e}")
+
     async def get_order_book(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
         """Get order book (depth) for a symbol."""
         try:
@@ -147,14 +158,17 @@ class BinanceSpotPublicAPI(BaseBinanceAPI):
             logger.exception("Error getting recent trades for %s", symbol)
             raise BinanceAPIError(f"Error getting recent trades for {symbol}: {e}")
 
-    async def get_klines(self, symbol: str, interval: str = "1m", limit: int = 500) -> List[List[Union[str, float, int]]]:
-        """Get kline/candlestick data."""
+    async def get_klines(self, symbol: str, interval: str = "1m", limit: int = 500,
+                         start_time: Optional[int] = None) -> List[List[Union[str, float, int]]]:
+        """Get kline/candlestick data (optionally only bars opened at/after start_time ms)."""
         try:
             symbol_clean = self._validate_symbol(symbol)
             logger.debug("Requesting klines for %s interval=%s limit=%s", symbol_clean, interval, limit)
+            params: Dict[str, Any] = {"symbol": symbol_clean, "interval": interval, "limit": limit}
+            if start_time is not None:
+                params["startTime"] = start_time
             return await self.circuit_breaker.execute(
-                self.http._request, "GET", "/api/v3/klines", 
-                {"symbol": symbol_clean, "interval": interval, "limit": limit}
+                self.http._request, "GET", "/api/v3/klines", params
             )
         except Exception as e:
             logger.exception("Error getting klines for %s", symbol)
@@ -278,12 +292,6 @@ class BinanceSpotPublicAPI(BaseBinanceAPI):
             logger.exception("Error getting ui klines for %s", symbol)
             raise BinanceAPIError(f"Error getting ui klines for {symbol}: {e}")
 
-    #
-    # BinanceSpotPublicAPI class'ına ek
-    async def get_symbol_price(self, symbol: str) -> Dict[str, Any]:
-        """Get current price for a symbol - alias for get_symbol_price"""
-        return await self.get_symbol_price(symbol)
-
     async def get_advanced_market_metrics(self, symbol: str) -> Dict[str, Any]:
         """Get advanced market metrics by aggregating multiple endpoints."""
         try:
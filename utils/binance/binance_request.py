@@ -7,20 +7,24 @@ Rate limiting: Weight limit sabiti (1200) hard-coded, dinamik olmalı
 """
 
 import aiohttp
+import yarl
 import asyncio
 import time
 import logging
 import hashlib
 import hmac
 import urllib.parse
-import json
 import platform
 from typing import Dict, List, Any, Optional, Union
-from .binance_constants import BASE_URL, FUTURES_URL, DEFAULT_CONFIG
+from .binance_constants import (
+    BASE_URL, FUTURES_URL, DEFAULT_CONFIG,
+    DEFAULT_ENDPOINT_WEIGHT, ENDPOINT_WEIGHTS, ENDPOINT_WEIGHTS_ALL_SYMBOLS
+)
 from .binance_exceptions import (
     BinanceAPIError, BinanceRequestError, BinanceRateLimitError,
     BinanceAuthenticationError, BinanceTimeoutError
 )
+from .binance_json import JSONDecodeError, dumps, loads
 from .binance_metrics import MetricsManager
 
 logger = logging.getLogger(__name__)
@@ -55,6 +59,12 @@ class BinanceHTTPClient:
         self.api_key = api_key
         self.secret_key = secret_key
         
+        # Keyed HMAC template: key schedule bir kez hesaplanır, imzada copy() edilir
+        self._hmac_template = (
+            hmac.new(secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+            if secret_key else None
+        )
+        
         # Use provided URLs or fall back to constants
         self.base_url = base_url or BASE_URL
         self.fapi_url = fapi_url or FUTURES_URL
@@ -62,6 +72,12 @@ class BinanceHTTPClient:
         # Merge provided config with defaults
         self.config = {**DEFAULT_CONFIG, **(config or {})}
         
+        # Request başına yeniden kurulmayan sabit header seti
+        self._base_headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': f'BinancePythonClient/1.0 (Python {platform.python_version()})'
+        }
+        
         # Session management
         self._session_provided_externally = session is not None
         self._session = session
@@ -70,7 +86,7 @@ class BinanceHTTPClient:
         self._last_request_time = 0
         self._min_request_interval = 1.0 / self.config.get("requests_per_second", 10)
         self._weight_used = 0
-        self._weight_reset_time = time.time() + 60
+        self._weight_reset_time = time.monotonic() + 60
         self._weight_limit = 1200  # Default Binance weight limit
         
         # Initialize metrics
@@ -102,6 +118,7 @@ class BinanceHTTPClient:
             self._session = aiohttp.ClientSession(
                 timeout=timeout,
                 connector=connector,
+                json_serialize=dumps,
                 # We own the session if we created it
                 connector_owner=not self._session_provided_externally
             )
@@ -132,15 +149,27 @@ class BinanceHTTPClient:
         Raises:
             BinanceAuthenticationError: If secret key is not available
         """
-        if not self.secret_key:
+        return self._sign_query(urllib.parse.urlencode(params))
+    
+    def _sign_query(self, query_string: str) -> str:
+        """
+        Generate HMAC SHA256 signature for an already encoded query string.
+        
+        Args:
+            query_string: URL-encoded request parameters
+            
+        Returns:
+            str: HMAC SHA256 signature
+            
+        Raises:
+            BinanceAuthenticationError: If secret key is not available
+        """
+        if not self.secret_key or self._hmac_template is None:
             raise BinanceAuthenticationError("Secret key required for signed requests")
         
-        query_string = urllib.parse.urlencode(params)
-        return hmac.new(
-            self.secret_key.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        mac = self._hmac_template.copy()
+        mac.update(query_string.encode('utf-8'))
+        return mac.hexdigest()
     
     def _add_auth_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
         """
@@ -156,34 +185,97 @@ class BinanceHTTPClient:
             headers['X-MBX-APIKEY'] = self.api_key
         return headers
     
-    async def _rate_limit(self) -> None:
-        """Implement rate limiting between requests."""
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
+    async def _rate_limit(self, now: float) -> float:
+        """
+        Implement rate limiting between requests.
+        
+        Args:
+            now: Current time.monotonic() value
+            
+        Returns:
+            float: Monotonic dispatch time (after any rate-limit sleep)
+        """
+        time_since_last = now - self._last_request_time
         
         if time_since_last < self._min_request_interval:
             sleep_time = self._min_request_interval - time_since_last
             logger.debug(f"Rate limiting: sleeping for {sleep_time:.3f}s")
             await asyncio.sleep(sleep_time)
+            now += sleep_time
         
-        self._last_request_time = time.time()
+        self._last_request_time = now
+        return now
     
-    async def _handle_rate_limit(self, response_headers: Dict[str, str]) -> None:
+    @staticmethod
+    def _get_endpoint_weight(endpoint: str, params: Optional[Dict[str, Any]]) -> int:
+        """
+        Get request weight of an endpoint.
+        
+        Args:
+            endpoint: API endpoint path
+            params: Request parameters
+            
+        Returns:
+            int: Weight consumed by the request
+        """
+        if not params or 'symbol' not in params:
+            weight = ENDPOINT_WEIGHTS_ALL_SYMBOLS.get(endpoint)
+            if weight is not None:
+                return weight
+        return ENDPOINT_WEIGHTS.get(endpoint, DEFAULT_ENDPOINT_WEIGHT)
+    
+    async def _reset_weight_window(self, now: float) -> None:
+        """Start a new one-minute weight window."""
+        logger.debug(f"Resetting weight counter: {self._weight_used} used")
+        self._weight_used = 0
+        self._weight_reset_time = now + 60
+        await self.metrics.reset_rate_limit()
+    
+    async def _acquire_weight(self, weight: int, now: float) -> float:
+        """
+        Reserve request weight from the current minute budget.
+        
+        Waits for the window reset when the budget would be exceeded,
+        instead of sending the request and getting a 429.
+        
+        Args:
+            weight: Weight of the request about to be sent
+            now: Current time.monotonic() value
+            
+        Returns:
+            float: Monotonic time after any wait
+        """
+        if now > self._weight_reset_time:
+            await self._reset_weight_window(now)
+        elif self._weight_used + weight > self._weight_limit:
+            sleep_time = self._weight_reset_time - now
+            logger.warning(
+                f"Weight budget exhausted ({self._weight_used}/{self._weight_limit}), "
+                f"sleeping for {sleep_time:.2f}s"
+            )
+            await asyncio.sleep(sleep_time)
+            now += sleep_time
+            await self._reset_weight_window(now)
+        
+        self._weight_used += weight
+        return now
+    
+    async def _handle_rate_limit(self, response_headers: Dict[str, str], weight: int = 1) -> None:
         """
         Handle rate limit information from response headers.
         
         Args:
             response_headers: Response headers from Binance API
+            weight: Weight reserved for the request
         """
-        # Extract rate limit information
-        weight = response_headers.get('X-MBX-USED-WEIGHT', '0')
-        order_count = response_headers.get('X-MBX-ORDER-COUNT-10S', '0')
+        await self.metrics.record_rate_limit(weight)
         
-        # Update weight-based rate limiting
+        # Server-side usage is authoritative; reconcile the local budget with it
+        used = (response_headers.get('X-MBX-USED-WEIGHT-1M') or
+                response_headers.get('X-MBX-USED-WEIGHT'))
         try:
-            weight_used = int(weight)
-            await self.metrics.record_rate_limit(weight_used)
-            self._weight_used += weight_used
+            if used is not None:
+                self._weight_used = int(used)
             
             # Update weight limit if provided
             weight_limit = response_headers.get('X-MBX-WEIGHT-LIMIT')
@@ -192,13 +284,6 @@ class BinanceHTTPClient:
                 
         except (ValueError, TypeError) as e:
             logger.warning(f"Failed to parse rate limit headers: {e}")
-        
-        # Reset weight counter every minute
-        if time.time() > self._weight_reset_time:
-            logger.debug(f"Resetting weight counter: {self._weight_used} used")
-            self._weight_used = 0
-            self._weight_reset_time = time.time() + 60
-            await self.metrics.reset_rate_limit()
     
     async def _request(
         self,
@@ -236,18 +321,20 @@ class BinanceHTTPClient:
         # Prepare request URL and headers
         base_url = self.fapi_url if futures else self.base_url
         url = f"{base_url}{endpoint}"
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': f'BinancePythonClient/1.0 (Python {platform.python_version()})'
-        }
+        headers = self._base_headers.copy()
+        
+        weight = self._get_endpoint_weight(endpoint, params)
         
-        # Add signature for authenticated requests
+        # Add signature for authenticated requests.
+        # Query string bir kez encode edilir; hem imza hem gönderim aynı string'i kullanır.
+        signed_query: Optional[str] = None
         if signed:
             params = params.copy()  # Don't modify original params
             params['timestamp'] = int(time.time() * 1000)
             if 'recvWindow' not in params:
                 params['recvWindow'] = self.config["recv_window"]
-            params['signature'] = self._generate_signature(params)
+            query = urllib.parse.urlencode(params)
+            signed_query = f"{query}&signature={self._sign_query(query)}"
         
         headers = self._add_auth_headers(headers)
         
@@ -255,35 +342,40 @@ class BinanceHTTPClient:
         last_exception = None
         for attempt in range(retries + 1):
             try:
-                await self._rate_limit()
+                # Tek monotonic okuma; weight + rate limit aynı zaman damgasını kullanır
+                now = await self._acquire_weight(weight, time.monotonic())
+                start_time = await self._rate_limit(now)
                 
                 session = await self._get_session()
-                start_time = time.time()
                 
                 # Prepare request based on method
                 request_params = {
                     'method': method,
                     'url': url,
                     'headers': headers,
-                    'params': params if method == 'GET' else None,
+                    'params': None,
                 }
                 
-                # For non-GET requests with data
-                if method != 'GET':
-                    if signed:
-                        request_params['data'] = urllib.parse.urlencode(params)
+                if signed_query is not None:
+                    if method == 'GET':
+                        # Hazır encode edilmiş query; yarl tekrar quote etmez
+                        request_params['url'] = yarl.URL(f"{url}?{signed_query}", encoded=True)
                     else:
-                        request_params['json'] = params
+                        request_params['data'] = signed_query
+                elif method == 'GET':
+                    request_params['params'] = params
+                else:
+                    request_params['json'] = params
                 
                 async with session.request(**request_params) as response:
-                    response_time = time.time() - start_time
+                    response_time = time.monotonic() - start_time
                     
                     # Handle rate limits from response headers
-                    await self._handle_rate_limit(response.headers)
+                    await self._handle_rate_limit(response.headers, weight)
                     
                     # Parse successful response
                     if response.status == 200:
-                        data = await response.json()
+                        data = loads(await response.read())
                         await self.metrics.record_request(True, response_time)
                         return data
                     
@@ -337,7 +429,7 @@ class BinanceHTTPClient:
             Appropriate Binance exception based on error type
         """
         try:
-            error_json = json.loads(error_data) if error_data else {}
+            error_json = loads(error_data) if error_data else {}
             error_code = error_json.get('code', -1)
             error_msg = error_json.get('msg', 'Unknown error')
             
@@ -352,7 +444,7 @@ class BinanceHTTPClient:
             else:
                 raise BinanceRequestError(f"HTTP {status_code}: {error_msg}")
                 
-        except (ValueError, json.JSONDecodeError):
+        except (ValueError, JSONDecodeError):
             await self.metrics.record_request(False, response_time, "invalid_response")
             raise BinanceRequestError(f"HTTP {status_code}: Invalid response: {error_data}")
     
@@ -3,11 +3,9 @@ Utility functions for Binance API.
 """
 
 import time
-import hashlib
 import hmac
-import json
 import asyncio  # bu satırı ekle
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -28,11 +26,12 @@ def generate_signature(secret_key: str, params: Dict[str, Any]) -> str:
         HMAC SHA256 signature
     """
     query_string = '&'.join([f"{k}={v}" for k, v in sorted(params.items())])
-    return hmac.new(
+    # hmac.digest: OpenSSL one-shot HMAC, ara HMAC objesi oluşturmaz
+    return hmac.digest(
         secret_key.encode('utf-8'),
         query_string.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
+        'sha256'
+    ).hex()
 
 
 def validate_symbol(symbol: str) -> bool:
@@ -102,6 +101,13 @@ def convert_to_timestamp(dt: datetime) -> int:
     return int(dt.timestamp() * 1000)
 
 
+# KLINE_FIELDS içindeki sayısal (float) kolonlar ve indeksleri
+_KLINE_NUMERIC_COLUMNS = ['open', 'high', 'low', 'close', 'volume',
+                          'quote_asset_volume', 'taker_buy_base_asset_volume',
+                          'taker_buy_quote_asset_volume', 'ignore']
+_KLINE_NUMERIC_IDX = [KLINE_FIELDS.index(col) for col in _KLINE_NUMERIC_COLUMNS]
+
+
 def klines_to_dataframe(klines: List[List[Any]]) -> pd.DataFrame:
     """
     Convert Binance klines data to pandas DataFrame.
@@ -115,25 +121,39 @@ def klines_to_dataframe(klines: List[List[Any]]) -> pd.DataFrame:
     if not klines:
         return pd.DataFrame(columns=KLINE_FIELDS)
     
-    # Convert to DataFrame
-    df = pd.DataFrame(klines, columns=KLINE_FIELDS)
+    # Tek geçişte object matris -> float64 blok (kolon başına to_numeric yok)
+    raw = np.asarray(klines, dtype=object)
+    numeric = raw[:, _KLINE_NUMERIC_IDX].astype(np.float64)
     
-    # Convert data types
-    numeric_columns = ['open', 'high', 'low', 'close', 'volume', 
-                      'quote_asset_volume', 'taker_buy_base_asset_volume',
-                      'taker_buy_quote_asset_volume', 'ignore']
+    columns: Dict[str, Any] = {
+        col: numeric[:, i] for i, col in enumerate(_KLINE_NUMERIC_COLUMNS)
+    }
+    columns['close_time'] = pd.to_datetime(raw[:, 6].astype(np.int64), unit='ms')
+    columns['number_of_trades'] = raw[:, 8].astype(np.int64)
     
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    index = pd.DatetimeIndex(
+        pd.to_datetime(raw[:, 0].astype(np.int64), unit='ms'), name='open_time'
+    )
+    df = pd.DataFrame(columns, index=index)
     
-    # Convert timestamps
-    df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
-    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+    return df[KLINE_FIELDS[1:]]
+
+
+def klines_to_arrays(klines: List[List[Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert Binance klines data to NumPy arrays without building a DataFrame.
     
-    # Set index
-    df.set_index('open_time', inplace=True)
+    Args:
+        klines: List of kline data from Binance API
+        
+    Returns:
+        (open_time int64 ms array, OHLCV float64 array of shape (n, 5))
+    """
+    if not klines:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
     
-    return df
+    raw = np.asarray(klines, dtype=object)
+    return raw[:, 0].astype(np.int64), raw[:, 1:6].astype(np.float64)
 
 
 def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
@@ -149,10 +169,13 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     
+    close = df['close']
+    rolling_20 = close.rolling(window=20)
+    
     # Simple Moving Averages
-    df['sma_20'] = df['close'].rolling(window=20).mean()
-    df['sma_50'] = df['close'].rolling(window=50).mean()
-    df['sma_200'] = df['close'].rolling(window=200).mean()
+    df['sma_20'] = rolling_20.mean()
+    df['sma_50'] = close.rolling(window=50).mean()
+    df['sma_200'] = close.rolling(window=200).mean()
     
     # Exponential Moving Averages
     df['ema_12'] = df['close'].ewm(span=12).mean()
@@ -170,9 +193,9 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     rs = gain / loss
     df['rsi'] = 100 - (100 / (1 + rs))
     
-    # Bollinger Bands
-    df['bb_middle'] = df['close'].rolling(window=20).mean()
-    bb_std = df['close'].rolling(window=20).std()
+    # Bollinger Bands (orta bant = sma_20, tekrar hesaplanmaz)
+    df['bb_middle'] = df['sma_20']
+    bb_std = rolling_20.std()
     df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
     df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
     
@@ -358,4 +381,22 @@ async def async_sleep_until(timestamp: int) -> None:
     current_time = int(time.time() * 1000)
     sleep_time = (timestamp - current_time) / 1000
     if sleep_time > 0:
-        await asyncio.sleep(sleep_time)
\ No newline at end of file
+        await asyncio.sleep(sleep_time)
+
+
+def enable_uvloop() -> bool:
+    """
+    Install uvloop as the asyncio event loop policy if available.
+    
+    Must be called before the event loop is created (asyncio.run).
+    
+    Returns:
+        True if uvloop was enabled, False if it is not installed (e.g. Windows)
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
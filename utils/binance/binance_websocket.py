@@ -10,10 +10,14 @@ WebSocket client for Binance API with aiogram 3.x compatibility.
 """
 
 import asyncio
-import json
+import contextlib
+import functools
+import inspect
+import itertools
 import time  # bu satırı ekle
 import logging
-from typing import Dict, List, Any, Optional, Callable, Set, Union
+from array import array
+from typing import Dict, List, Any, Optional, Callable, Set, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -24,10 +28,65 @@ from aiogram.types import Message
 
 from .binance_constants import BASE_URL, FUTURES_URL, WS_STREAMS
 from .binance_exceptions import BinanceWebSocketError
+from .binance_json import dumps, loads
 from .binance_utils import generate_signature
 
 logger = logging.getLogger(__name__)
 
+# Dolu kuyrukta atılan market data frame'leri için uyarı sıklığı (ilk drop + her N'de bir)
+DROP_LOG_INTERVAL = 1000
+
+# WS frame decoder: simdjson varsa SIMD parser (tek instance, tekrar kullanılır),
+# yoksa binance_json backend'i (orjson → ujson → json). recursive=True → callback'lere native dict/list verilir,
+# proxy objeleri bir sonraki parse'ta geçersizleşmez.
+try:
+    import simdjson
+
+    _ws_parser = simdjson.Parser()
+
+    def _decode_frame(message: Union[str, bytes]) -> Any:
+        return _ws_parser.parse(message, recursive=True)
+except ImportError:
+    _decode_frame = loads
+
+
+class _MessageClock:
+    """
+    Fixed-size ring buffer of receive timestamps (monotonic_ns, int64).
+    
+    Mesaj başına float objesi tutulmaz; zaman damgaları bitişik int64 buffer'da.
+    """
+    __slots__ = ("_times", "_size", "_idx", "_count")
+
+    def __init__(self, size: int = 100):
+        self._times = array('q', bytes(8 * size))
+        self._size = size
+        self._idx = 0
+        self._count = 0
+
+    def mark(self, monotonic_ns: Callable[[], int] = time.monotonic_ns) -> None:
+        """Record a receive timestamp."""
+        idx = self._idx
+        self._times[idx] = monotonic_ns()
+        self._idx = (idx + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def rate(self) -> float:
+        """
+        Messages per second over the buffered window.
+        
+        Returns:
+            Message rate, 0.0 if not enough samples
+        """
+        count = self._count
+        if count < 2:
+            return 0.0
+        newest = self._times[(self._idx - 1) % self._size]
+        oldest = self._times[(self._idx - count) % self._size]
+        elapsed_ns = newest - oldest
+        return (count - 1) * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+
 
 class StreamType(Enum):
     """Enum for WebSocket stream types."""
@@ -47,6 +106,7 @@ class WebSocketConfig:
     reconnect_delay: int = 1
     max_reconnect_delay: int = 60
     keepalive_interval: int = 1800  # 30 minutes
+    queue_max_size: int = 10000  # reader → worker kuyruğu, dolunca en eski frame atılır
 
 
 class BinanceWebSocketManager:
@@ -92,6 +152,7 @@ class BinanceWebSocketManager:
         self.subscriptions: Dict[str, Set[str]] = {}
         self.callbacks: Dict[str, List[Callable]] = {}
         self.listen_keys: Dict[str, str] = {}
+        self._request_ids = itertools.count(1)
         
         self.router = router or Router()
         self._setup_handlers()
@@ -135,18 +196,28 @@ class BinanceWebSocketManager:
             BinanceWebSocketError: If connection fails
         """
         try:
-            url = self.config.futures_url if futures else self.config.base_url
-            stream_param = '/'.join(streams)
-            ws_url = f"{url}/stream?streams={stream_param}"
+            # Aynı stream seti zaten açıksa ikinci socket açma (TLS + upgrade RTT);
+            # callback'i mevcut bağlantıya ekle
+            existing_id = self._find_connection(streams, futures)
+            if existing_id is not None:
+                self.add_callback(existing_id, callback)
+                logger.info(f"♻️ Reusing WebSocket connection {existing_id} for {len(streams)} streams")
+                return existing_id
+            
+            ws_url = self._stream_url(streams, futures)
             
             connection_id = f"{'futures_' if futures else 'spot_'}{int(time.time() * 1000)}"
             
             self.connections[connection_id] = {
                 'url': ws_url,
                 'streams': streams,
-                'callback': callback,
+                'callbacks': [callback],
+                'dispatch': self._build_dispatch([callback]),
+                'message_clock': _MessageClock(),
+                'dropped_messages': 0,
                 'futures': futures,
                 'running': True,
+                'ws': None,
                 'task': None
             }
             
@@ -162,6 +233,167 @@ class BinanceWebSocketManager:
             logger.error(f"❌ Failed to create WebSocket connection: {e}")
             raise BinanceWebSocketError(f"Connection failed: {e}") from e
 
+    def _stream_url(self, streams: List[str], futures: bool) -> str:
+        """Build the combined stream URL (tek socket, çok stream)."""
+        url = self.config.futures_url if futures else self.config.base_url
+        return f"{url}/stream?streams={'/'.join(streams)}"
+
+    async def add_streams(self, connection_id: str, streams: List[str]) -> None:
+        """
+        Add streams to an existing combined connection without reconnecting.
+        
+        Sends a SUBSCRIBE request on the live socket; the stored URL is updated
+        so reconnects keep the full stream set.
+        
+        Args:
+            connection_id: Connection ID
+            streams: Streams to add
+            
+        Raises:
+            KeyError: If connection ID not found
+            BinanceWebSocketError: If connection is a user data stream
+        """
+        connection = self._get_market_connection(connection_id)
+        new_streams = [s for s in streams if s not in connection['streams']]
+        if not new_streams:
+            return
+        
+        connection['streams'] = connection['streams'] + new_streams
+        connection['url'] = self._stream_url(connection['streams'], connection['futures'])
+        await self._send_stream_request(connection, "SUBSCRIBE", new_streams)
+        logger.info(f"✅ {len(new_streams)} streams added to WebSocket {connection_id}")
+
+    async def remove_streams(self, connection_id: str, streams: List[str]) -> None:
+        """
+        Remove streams from an existing combined connection without reconnecting.
+        
+        Args:
+            connection_id: Connection ID
+            streams: Streams to remove
+            
+        Raises:
+            KeyError: If connection ID not found
+            BinanceWebSocketError: If connection is a user data stream
+        """
+        connection = self._get_market_connection(connection_id)
+        removed = [s for s in streams if s in connection['streams']]
+        if not removed:
+            return
+        
+        connection['streams'] = [s for s in connection['streams'] if s not in removed]
+        connection['url'] = self._stream_url(connection['streams'], connection['futures'])
+        await self._send_stream_request(connection, "UNSUBSCRIBE", removed)
+        logger.info(f"✅ {len(removed)} streams removed from WebSocket {connection_id}")
+
+    def _get_market_connection(self, connection_id: str) -> Dict[str, Any]:
+        """Return a market-data connection, rejecting user data streams."""
+        if connection_id not in self.connections:
+            raise KeyError(f"Connection {connection_id} not found")
+        
+        connection = self.connections[connection_id]
+        if 'listen_key' in connection:
+            raise BinanceWebSocketError("User data streams do not support dynamic subscriptions")
+        return connection
+
+    async def _send_stream_request(self, connection: Dict[str, Any], method: str, streams: List[str]) -> None:
+        """Send a SUBSCRIBE/UNSUBSCRIBE request if the socket is currently open."""
+        ws = connection.get('ws')
+        if ws is None:
+            # Bağlı değil: yeni URL bir sonraki bağlantıda kullanılır
+            return
+        await ws.send(dumps({"method": method, "params": streams, "id": next(self._request_ids)}))
+
+    def _find_connection(self, streams: List[str], futures: bool) -> Optional[str]:
+        """
+        Find a running market-data connection serving exactly these streams.
+        
+        Args:
+            streams: Requested streams
+            futures: Whether futures streams are requested
+            
+        Returns:
+            Connection ID or None
+        """
+        wanted = set(streams)
+        for connection_id, connection in self.connections.items():
+            if (connection['running'] and connection['futures'] == futures
+                    and 'listen_key' not in connection
+                    and set(connection['streams']) == wanted):
+                return connection_id
+        return None
+
+    @staticmethod
+    def _build_dispatch(
+        callbacks: List[Callable[[Dict[str, Any]], Any]]
+    ) -> Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]:
+        """
+        Split callbacks into (sync, async) groups once, outside the message loop.
+        
+        Args:
+            callbacks: Registered callbacks of a connection
+            
+        Returns:
+            Tuple of (sync callbacks, async callbacks)
+        """
+        sync_cbs: List[Callable] = []
+        async_cbs: List[Callable] = []
+        for cb in callbacks:
+            (async_cbs if BinanceWebSocketManager._is_async_callable(cb) else sync_cbs).append(cb)
+        return tuple(sync_cbs), tuple(async_cbs)
+
+    @staticmethod
+    def _is_async_callable(callback: Callable) -> bool:
+        """
+        Check whether callback returns a coroutine (partials and async __call__ included).
+        
+        Args:
+            callback: Callback to inspect
+            
+        Returns:
+            True if the callback must be awaited
+        """
+        while isinstance(callback, functools.partial):
+            callback = callback.func
+        return (inspect.iscoroutinefunction(callback)
+                or inspect.iscoroutinefunction(getattr(callback, '__call__', None)))
+
+    def add_callback(self, connection_id: str, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Attach an additional callback to an existing connection.
+        
+        Args:
+            connection_id: Connection ID
+            callback: Callback function for messages
+            
+        Raises:
+            KeyError: If connection ID not found
+        """
+        if connection_id not in self.connections:
+            raise KeyError(f"Connection {connection_id} not found")
+        
+        connection = self.connections[connection_id]
+        # Copy-on-write: liste mutate edilmez, yeniden bağlanır → okuyucu kopyalamadan iterate eder
+        connection['callbacks'] = connection['callbacks'] + [callback]
+        connection['dispatch'] = self._build_dispatch(connection['callbacks'])
+
+    def remove_callback(self, connection_id: str, callback: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Detach a callback from an existing connection.
+        
+        Args:
+            connection_id: Connection ID
+            callback: Previously registered callback
+            
+        Raises:
+            KeyError: If connection ID not found
+        """
+        if connection_id not in self.connections:
+            raise KeyError(f"Connection {connection_id} not found")
+        
+        connection = self.connections[connection_id]
+        connection['callbacks'] = [cb for cb in connection['callbacks'] if cb is not callback]
+        connection['dispatch'] = self._build_dispatch(connection['callbacks'])
+
     async def _run_connection(self, connection_id: str) -> None:
         """Main WebSocket connection loop with proper error handling."""
         if connection_id not in self.connections:
@@ -175,31 +407,105 @@ class BinanceWebSocketManager:
                 async with websockets.connect(connection['url']) as ws:
                     logger.info(f"🔗 WebSocket {connection_id} connected")
                     reconnect_delay = self.config.reconnect_delay
+                    connection['ws'] = ws
+                    
+                    # Okuma ve callback işleme ayrı: yavaş callback socket'i bekletmez
+                    queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_max_size)
+                    worker = asyncio.create_task(self._dispatch_messages(connection, queue))
                     
-                    # Main message loop
-                    while connection['running']:
-                        try:
-                            message = await asyncio.wait_for(ws.recv(), timeout=30.0)
-                            data = json.loads(message)
-                            await connection['callback'](data)
-                        except asyncio.TimeoutError:
-                            # Send ping to keep connection alive
-                            await ws.ping()
-                            continue
-                        except json.JSONDecodeError as e:
-                            logger.error(f"❌ JSON decode error: {e}")
-                        except Exception as e:
-                            logger.error(f"❌ Callback error: {e}")
+                    # Frame başına dict/attribute lookup olmaması için local'e bağla
+                    recv = ws.recv
+                    put_nowait = queue.put_nowait
+                    mark_message = connection['message_clock'].mark
+                    # User data stream (emir/bakiye) frame'leri atılamaz: backpressure uygulanır
+                    user_stream = 'listen_key' in connection
+                    
+                    # Main receive loop
+                    try:
+                        while connection['running']:
+                            try:
+                                message = await asyncio.wait_for(recv(), timeout=30.0)
+                            except asyncio.TimeoutError:
+                                # Send ping to keep connection alive
+                                await ws.ping()
+                                continue
+                            
+                            mark_message()
+                            if user_stream:
+                                await queue.put(message)
+                                continue
+                            if queue.full():
+                                # Drop-oldest: market data'da en güncel veri öncelikli
+                                queue.get_nowait()
+                                dropped = connection['dropped_messages'] + 1
+                                connection['dropped_messages'] = dropped
+                                if dropped == 1 or dropped % DROP_LOG_INTERVAL == 0:
+                                    logger.warning(
+                                        "⚠️ WebSocket %s queue full, %d market data frames dropped so far",
+                                        connection_id, dropped
+                                    )
+                            put_nowait(message)
+                    finally:
+                        worker.cancel()
+                        with contextlib.suppress(asyncio.CancelledError):
+                            await worker
                             
             except websockets.ConnectionClosed:
                 logger.warning(f"⚠️ WebSocket {connection_id} connection closed, reconnecting...")
             except Exception as e:
                 logger.error(f"❌ WebSocket {connection_id} error: {e}")
+            finally:
+                connection['ws'] = None
                 
             # Exponential backoff for reconnection
             await asyncio.sleep(reconnect_delay)
             reconnect_delay = min(reconnect_delay * 2, self.config.max_reconnect_delay)
 
+    async def _dispatch_messages(self, connection: Dict[str, Any], queue: asyncio.Queue) -> None:
+        """
+        Worker loop: decode queued frames and run callbacks.
+        
+        Biriken frame'ler tek uyanışta toplu işlenir.
+        
+        Args:
+            connection: Connection state dict
+            queue: Raw frame queue filled by the receive loop
+        """
+        get = queue.get
+        get_nowait = queue.get_nowait
+        loads = _decode_frame
+        gather = asyncio.gather
+        
+        while True:
+            batch = [await get()]
+            for _ in range(queue.qsize()):
+                batch.append(get_nowait())
+            
+            sync_cbs, async_cbs = connection['dispatch']
+            for message in batch:
+                try:
+                    data = loads(message)
+                except ValueError as e:
+                    logger.error(f"❌ JSON decode error: {e}")
+                    continue
+                
+                if 'result' in data and 'id' in data:
+                    # SUBSCRIBE/UNSUBSCRIBE yanıtı, stream verisi değil
+                    continue
+                
+                try:
+                    for cb in sync_cbs:
+                        cb(data)
+                    if len(async_cbs) == 1:
+                        await async_cbs[0](data)
+                    elif async_cbs:
+                        # Yavaş bir callback diğerlerini bekletmesin: sum → max latency
+                        for result in await gather(*(cb(data) for cb in async_cbs), return_exceptions=True):
+                            if isinstance(result, Exception):
+                                logger.error(f"❌ Callback error: {result}")
+                except Exception as e:
+                    logger.error(f"❌ Callback error: {e}")
+
     async def disconnect(self, connection_id: str) -> None:
         """
         Disconnect WebSocket connection.
@@ -257,9 +563,13 @@ class BinanceWebSocketManager:
             self.connections[connection_id] = {
                 'url': ws_url,
                 'streams': ['userData'],
-                'callback': callback,
+                'callbacks': [callback],
+                'dispatch': self._build_dispatch([callback]),
+                'message_clock': _MessageClock(),
+                'dropped_messages': 0,
                 'futures': futures,
                 'running': True,
+                'ws': None,
                 'listen_key': listen_key,
                 'task': None,
                 'keepalive_task': None
@@ -306,7 +616,7 @@ class BinanceWebSocketManager:
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, headers=headers) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=loads)
                         return data['listenKey']
                     else:
                         error_text = await response.text()
@@ -386,7 +696,15 @@ class BinanceWebSocketManager:
         return {
             'active_connections': len(self.connections),
             'running': self.running,
-            'subscriptions': {k: len(v) for k, v in self.subscriptions.items()}
+            'subscriptions': {k: len(v) for k, v in self.subscriptions.items()},
+            'message_rates': {
+                connection_id: connection['message_clock'].rate()
+                for connection_id, connection in self.connections.items()
+            },
+            'dropped_messages': {
+                connection_id: connection['dropped_messages']
+                for connection_id, connection in self.connections.items()
+            }
         }
 
     # Convenience methods for common streams
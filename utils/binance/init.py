@@ -6,6 +6,7 @@ from .binance_a import BinanceClient
 from .binance_request import BinanceHTTPClient
 from .binance_circuit_breaker import CircuitBreaker
 from .binance_exceptions import BinanceAPIError, BinanceAuthenticationError
+from .binance_utils import enable_uvloop
 
 __version__ = "1.0.0"
 __all__ = [
@@ -14,4 +15,5 @@ __all__ = [
     "CircuitBreaker",
     "BinanceAPIError",
     "BinanceAuthenticationError",
+    "enable_uvloop",
 ]
\ No newline at end of file